@@ -5,15 +5,25 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from config import Config
 from dbmodles.weather import db
+from dbmodles.migrate import migrate_weather_schema
 from routs.main_routs2 import main
+from routs.api_routs import api
+from services.scheduler import ForecastScheduler
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
 db.init_app(app)
 app.register_blueprint(main)
+app.register_blueprint(api)
+
+# Hourly forecast precompute for the known locations; started by the server process
+scheduler = ForecastScheduler(app)
 
 if __name__ == "__main__":
     with app.app_context():
-        db.create_all()
+        # create_all plus the one-off re-key of databases from before grid-cell keys
+        migrate_weather_schema()
+    if Config.PRECOMPUTE_FORECASTS:
+        scheduler.start()
     app.run(debug=True)
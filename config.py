@@ -1,3 +1,61 @@
+import os
+
+
 class Config:
     SQLALCHEMY_DATABASE_URI = "sqlite:///weather.db"
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Open-Meteo endpoints, overridable so the client can run against a local stand-in server
+    OPEN_METEO_ARCHIVE_URL = os.environ.get("OPEN_METEO_ARCHIVE_URL", "https://archive-api.open-meteo.com/v1/archive")
+    OPEN_METEO_FORECAST_URL = os.environ.get("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+    # Certificate checks for Open-Meteo; HTTP_VERIFY_TLS=0 turns them off for a self-signed stand-in
+    HTTP_VERIFY_TLS = os.environ.get("HTTP_VERIFY_TLS", "1") == "1"
+
+    # On-disk response cache; archive ranges older than a week are treated as immutable
+    HTTP_CACHE_PATH = os.environ.get("HTTP_CACHE_PATH", "http_cache.db")
+    HISTORICAL_CACHE_TTL = 30 * 24 * 3600
+    FORECAST_CACHE_TTL = 15 * 60
+    HISTORICAL_SETTLE_DAYS = 7
+
+    # Geocoding cache: in-process LRU backed by a SQLite table
+    GEOCODE_CACHE_PATH = os.environ.get("GEOCODE_CACHE_PATH", "geocode_cache.db")
+    GEOCODE_CACHE_SIZE = 1024
+    GEOCODE_TTL = 30 * 24 * 3600
+    GEOCODE_NEGATIVE_TTL = 24 * 3600
+
+    # Grid spacing used to key cached weather by location (matches the Open-Meteo cells in our data)
+    LOCATION_GRID_DEGREES = 0.125
+
+    # Third-party providers shown on the further_analysis page
+    WEATHERBIT_URL = os.environ.get("WEATHERBIT_URL", "https://api.weatherbit.io/v2.0/forecast/hourly")
+    WEATHERBIT_API_KEY = os.environ.get("WEATHERBIT_API_KEY", "17b72ff288764539a6242f985d8e226b")
+    OPENWEATHER_URL = os.environ.get("OPENWEATHER_URL", "https://api.openweathermap.org/data/2.5/forecast")
+    OPENWEATHER_API_KEY = os.environ.get("OPENWEATHER_API_KEY", "255366c723b840c4627d88efcfc97d21")
+    PROVIDER_DEADLINE = 4.0
+
+    # Forecast result cache; set FORECAST_CACHE_PATH to "" to keep it in-process only
+    FORECAST_CACHE_PATH = os.environ.get("FORECAST_CACHE_PATH", "forecast_cache.db")
+    FORECAST_CACHE_SIZE = 2048
+    # SQLite tier eviction: entries older than FORECAST_RESULT_TTL go, and at most
+    # FORECAST_CACHE_DISK_ROWS are kept
+    FORECAST_RESULT_TTL = 48 * 3600
+    FORECAST_CACHE_DISK_ROWS = 100_000
+
+    # Hourly forecast precomputation for the known locations (services/scheduler.py)
+    PRECOMPUTE_FORECASTS = os.environ.get("PRECOMPUTE_FORECASTS", "1") == "1"
+    PRECOMPUTE_JITTER_SECONDS = 120
+    PRECOMPUTE_LOCK_PATH = os.environ.get("PRECOMPUTE_LOCK_PATH", "precompute.lock")
+
+    # Rendered forecasts handed to /further_analysis by id; "" keeps them in-process only,
+    # which only works with a single worker
+    FORECAST_STORE_PATH = os.environ.get("FORECAST_STORE_PATH", "forecast_store.db")
+    FORECAST_STORE_SIZE = 1024
+    FORECAST_STORE_TTL = 3600
+
+    # Coalescing of identical in-flight geocode/history/forecast work (services/singleflight.py):
+    # "thread" coalesces within a worker; "file" or "sqlite" also serialise across workers
+    SINGLEFLIGHT_BACKEND = os.environ.get("SINGLEFLIGHT_BACKEND", "file")
+    SINGLEFLIGHT_LOCK_DIR = os.environ.get("SINGLEFLIGHT_LOCK_DIR", "singleflight_locks")
+    SINGLEFLIGHT_LEASE_PATH = os.environ.get("SINGLEFLIGHT_LEASE_PATH", "singleflight.db")
+    SINGLEFLIGHT_LEASE_SECONDS = 30
+    SINGLEFLIGHT_WAIT_SECONDS = 30
@@ -0,0 +1,52 @@
+#location.py
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from config import Config
+from dbmodles.weather import db
+
+# (lat_index, lon_index) -> location key, filled as cells are looked up
+_key_cache = {}
+
+class Location(db.Model):
+    # One row per grid cell; Weather.location_id points here
+    __tablename__ = 'locations'
+    __table_args__ = (
+        db.UniqueConstraint('lat_index', 'lon_index', name='uq_locations_cell'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    lat_index = db.Column(db.Integer, nullable=False)
+    lon_index = db.Column(db.Integer, nullable=False)
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+
+
+def snap_to_cell(lat, lon):
+    # Grid cell at Open-Meteo's resolution, so geocoder drift inside a cell maps to the same key
+    grid = Config.LOCATION_GRID_DEGREES
+    return round(lat / grid), round(lon / grid)
+
+
+def cell_center(lat, lon):
+    lat_index, lon_index = snap_to_cell(lat, lon)
+    grid = Config.LOCATION_GRID_DEGREES
+    return round(lat_index * grid, 4), round(lon_index * grid, 4)
+
+
+def get_location_key(lat, lon):
+    """Integer key of the grid cell containing (lat, lon), registering the cell if new."""
+    cell = snap_to_cell(lat, lon)
+    key = _key_cache.get(cell)
+    if key is not None:
+        return key
+
+    center_lat, center_lon = cell_center(lat, lon)
+    stmt = sqlite_insert(Location).values(
+        lat_index=cell[0], lon_index=cell[1], latitude=center_lat, longitude=center_lon
+    ).on_conflict_do_nothing(index_elements=['lat_index', 'lon_index'])
+    db.session.execute(stmt)
+    db.session.commit()
+
+    key = db.session.query(Location.id).filter_by(lat_index=cell[0], lon_index=cell[1]).scalar()
+    _key_cache[cell] = key
+    return key
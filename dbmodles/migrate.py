@@ -0,0 +1,58 @@
+#migrate.py
+# Brings a weather.db from before grid-cell keys up to date. Older databases stored the
+# model's station id (0-5) in weather.location_id and have no unique
+# (location_id, date, hour) index, which upsert_hourly's ON CONFLICT needs. Every row
+# carries its own coordinates, so rows are re-keyed to their Location cell and the
+# table is rebuilt with the index. Duplicate hours in a cell keep the newest row.
+#
+# app2 and gunicorn.conf.py run this at start; by hand: python -m dbmodles.migrate
+
+from sqlalchemy import inspect, text
+
+from dbmodles.location import get_location_key
+from dbmodles.weather import Weather, db
+
+
+def weather_needs_migration():
+    inspector = inspect(db.engine)
+    if not inspector.has_table('weather'):
+        return False
+    return not any(index['name'] == 'ix_weather_location_time' for index in inspector.get_indexes('weather'))
+
+
+def migrate_weather_schema():
+    """Create missing tables and re-key an old weather table; returns True if it migrated."""
+    db.create_all()
+    if not weather_needs_migration():
+        return False
+
+    print("[STEP] Re-keying weather rows to grid cells...")
+    coords = db.session.execute(text("SELECT DISTINCT latitude, longitude FROM weather")).all()
+    keys = [{"latitude": lat, "longitude": lon, "location_id": get_location_key(lat, lon)} for lat, lon in coords]
+
+    with db.engine.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE weather RENAME TO weather_old")
+        Weather.__table__.create(conn)
+        conn.exec_driver_sql("CREATE TEMP TABLE cell_keys (latitude REAL, longitude REAL, location_id INTEGER)")
+        if keys:
+            conn.execute(text("INSERT INTO cell_keys VALUES (:latitude, :longitude, :location_id)"), keys)
+        conn.exec_driver_sql(
+            "INSERT OR REPLACE INTO weather (latitude, longitude, date, hour, temperature_2m, location_id) "
+            "SELECT w.latitude, w.longitude, w.date, w.hour, w.temperature_2m, k.location_id "
+            "FROM weather_old w JOIN cell_keys k ON w.latitude = k.latitude AND w.longitude = k.longitude "
+            "ORDER BY w.id"
+        )
+        migrated = conn.exec_driver_sql("SELECT COUNT(*) FROM weather").scalar()
+        conn.exec_driver_sql("DROP TABLE weather_old")
+        conn.exec_driver_sql("DROP TABLE cell_keys")
+
+    print(f"[INFO] weather table migrated: {migrated} rows in {len(keys)} cells")
+    return True
+
+
+if __name__ == "__main__":
+    from app2 import app
+
+    with app.app_context():
+        if not migrate_weather_schema():
+            print("[INFO] weather table is already up to date")
@@ -1,15 +1,78 @@
 #weather.py
 
+from datetime import datetime, timedelta
+
+import numpy as np
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 db = SQLAlchemy()
 
 class Weather(db.Model):
     __tablename__ = 'weather'
+    __table_args__ = (
+        # Composite index for hourly range scans; unique so it also backs the upsert's ON CONFLICT
+        db.Index('ix_weather_location_time', 'location_id', 'date', 'hour', unique=True),
+    )
     id = db.Column(db.Integer, primary_key=True)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
     date = db.Column(db.Date, nullable=False)
     hour = db.Column(db.Integer, nullable=False)
     temperature_2m = db.Column(db.Float)
+    # grid-cell key from dbmodles.location.get_location_key
     location_id = db.Column(db.Integer, nullable=True)
+
+
+def hourly_rows(location_id, lat, lon, times, temps):
+    # ISO hour strings + temperatures -> row dicts for upsert_hourly
+    rows = []
+    for time_str, temperature in zip(times, temps):
+        dt_obj = datetime.fromisoformat(time_str)
+        rows.append({
+            "latitude": lat,
+            "longitude": lon,
+            "date": dt_obj.date(),
+            "hour": dt_obj.hour,
+            "temperature_2m": temperature,
+            "location_id": location_id,
+        })
+    return rows
+
+
+def upsert_hourly(rows):
+    """Insert or update a window of hourly rows in a single statement."""
+    if not rows:
+        return
+    stmt = sqlite_insert(Weather).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['location_id', 'date', 'hour'],
+        set_={"temperature_2m": stmt.excluded.temperature_2m},
+    )
+    db.session.execute(stmt)
+    db.session.commit()
+
+
+def fetch_hourly_range(location_id, start_dt, end_dt):
+    """Temperatures for every hour from start_dt to end_dt in one indexed range query.
+
+    Slot i is the hour containing start_dt + i hours; hours with no row are NaN.
+    """
+    start = start_dt.replace(minute=0, second=0, microsecond=0)
+    n_hours = int((end_dt - start_dt) // timedelta(hours=1)) + 1
+    values = np.full(max(n_hours, 0), np.nan)
+    if n_hours <= 0:
+        return values
+    last = start + timedelta(hours=n_hours - 1)
+
+    records = db.session.query(Weather.date, Weather.hour, Weather.temperature_2m).filter(
+        Weather.location_id == location_id,
+        Weather.date.between(start.date(), last.date())
+    ).all()
+
+    for rec_date, rec_hour, temperature in records:
+        offset = (rec_date - start.date()).days * 24 + rec_hour - start.hour
+        if 0 <= offset < n_hours and temperature is not None:
+            values[offset] = temperature
+    return values
@@ -0,0 +1,39 @@
+# gunicorn.conf.py
+# gunicorn -c gunicorn.conf.py app2:app
+
+workers = 4
+bind = "0.0.0.0:8000"
+
+# Requests spend most of their time waiting on Open-Meteo and the providers, so each
+# worker serves several at once on threads sharing one keep-alive pool (http_client)
+worker_class = "gthread"
+threads = 8
+
+# Import the app (and the model) once in the master; forked workers then share the
+# memory-mapped model arrays instead of each loading a private copy
+preload_app = True
+
+
+def on_starting(server):
+    # MODEL_PATH (env) picks the artifact; by default the compiled, memory-mapped export
+    from services.load_predict2 import load_model
+    load_model()
+
+    # Schema changes run once, in the master, before any worker touches the db
+    from app2 import app
+    from dbmodles.migrate import migrate_weather_schema
+    from dbmodles.weather import db
+    with app.app_context():
+        migrate_weather_schema()
+        # SQLite connections can't be used across fork(); drop the master's pooled ones
+        # so every worker opens its own
+        db.engine.dispose()
+
+
+def post_fork(server, worker):
+    # Threads don't survive fork, so each worker starts its own scheduler; the lock
+    # file makes sure only one of them does a given hour's work
+    from config import Config
+    if Config.PRECOMPUTE_FORECASTS:
+        from app2 import scheduler
+        scheduler.start()
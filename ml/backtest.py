@@ -0,0 +1,187 @@
+# backtest.py
+# Replays stored hourly history through the batched recursive predictor
+# (services/load_predict2.predict_next_24_hours_batch). The issue time slides from
+# start to end every `stride` hours, and each 24h forecast is scored against the hours
+# that were later observed, giving MAE / RMSE / bias per horizon plus forecasts/sec.
+#
+# History is read per location in CHUNK_DAYS slices (each with the input lead-in and
+# 24h tail it needs) from the Parquet store or the app's SQLite weather table, so only
+# one slice per worker is in memory. Only error sums are kept between slices.
+# Locations are spread over a process pool, and each worker loads the model once.
+
+import os
+import sys
+import time
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+from numpy.lib.stride_tricks import sliding_window_view
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.load_predict2 import HORIZON, N_LAGS, load_model, predict_next_24_hours_batch
+from preprocess import load_temperature_frame
+from core.config2 import MODEL2_PATH, PARQUET_ROOT
+
+CHUNK_DAYS = 31
+TEMP_COL = 'temperature_2m (°C)'
+
+
+def _check_source(data_path):
+    if not (data_path.endswith(".db") or os.path.isdir(data_path)):
+        raise ValueError("backtest reads the Parquet store or a SQLite .db; "
+                         "convert CSVs first with core.dataset_store.convert_csv_to_parquet")
+
+
+def _time_range(data_path, location_id):
+    # First and last stored hour for a location, read from the time column alone
+    if data_path.endswith(".db"):
+        with sqlite3.connect(data_path) as conn:
+            first, last = conn.execute(
+                "SELECT MIN(date), MAX(date) FROM weather WHERE location_id = ?", (location_id,)
+            ).fetchone()
+        if first is None:
+            return None, None
+        return pd.Timestamp(first), pd.Timestamp(last) + pd.Timedelta(hours=23)
+
+    dataset = ds.dataset(data_path, format='parquet', partitioning='hive')
+    times = dataset.to_table(columns=['time'], filter=ds.field('location_id') == location_id).column('time')
+    if len(times) == 0:
+        return None, None
+    bounds = pc.min_max(times).as_py()
+    return pd.Timestamp(bounds['min']), pd.Timestamp(bounds['max'])
+
+
+def _model_location_id(data_path, location_id):
+    # The model's location feature is the known-location id. The Parquet store is
+    # partitioned by that id; the SQLite table is keyed by grid cell, so map the cell
+    # to its nearest known location.
+    if not data_path.endswith(".db"):
+        return location_id
+    from services.locations import get_nearest_location_id
+    with sqlite3.connect(data_path) as conn:
+        lat, lon = conn.execute(
+            "SELECT latitude, longitude FROM weather WHERE location_id = ? LIMIT 1", (location_id,)
+        ).fetchone()
+    return get_nearest_location_id(lat, lon)
+
+
+def _hourly_slice(data_path, location_id, first, last):
+    # Temperatures on a gap-free hourly grid from first to last; missing hours are NaN
+    # so a gap can't silently shift a window
+    df = load_temperature_frame(data_path, location_id=location_id, start=first, end=last)
+    df['time'] = pd.to_datetime(df['time'])
+    series = df.drop_duplicates('time').set_index('time')[TEMP_COL]
+    return series.reindex(pd.date_range(first, last, freq='h')).to_numpy(dtype=np.float64)
+
+
+def _init_worker(model_path):
+    load_model(model_path)
+
+
+def backtest_location(data_path, location_id, start=None, end=None, stride=1):
+    """Error sums for every forecast issued at a location between start and end.
+
+    The issue time is the last observed hour of the input window. Returns a dict
+    of per-horizon sums, so results from slices and locations can be added up.
+    """
+    first, last = _time_range(data_path, location_id)
+    if first is None:
+        return None
+    # earliest issue hour with a full input window, latest with a full 24h of actuals
+    start = max(pd.Timestamp(start) if start is not None else first, first + pd.Timedelta(hours=N_LAGS - 1))
+    end = min(pd.Timestamp(end) if end is not None else last, last - pd.Timedelta(hours=HORIZON))
+    model_location_id = _model_location_id(data_path, location_id)
+
+    stats = {
+        "location_id": location_id, "n": 0, "skipped": 0, "predict_seconds": 0.0,
+        "sum_err": np.zeros(HORIZON), "sum_abs": np.zeros(HORIZON), "sum_sq": np.zeros(HORIZON),
+    }
+    chunk = pd.Timedelta(days=CHUNK_DAYS)
+    start = start.ceil('h')
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(chunk_start + chunk - pd.Timedelta(hours=1), end)
+        temps = _hourly_slice(data_path, location_id,
+                              chunk_start - pd.Timedelta(hours=N_LAGS - 1),
+                              chunk_end + pd.Timedelta(hours=HORIZON))
+
+        # keep issue hours on the start + k * stride grid whatever the chunk boundaries
+        offset = -int((chunk_start - start) / pd.Timedelta(hours=1)) % stride
+        spans = sliding_window_view(temps, N_LAGS + HORIZON)[offset::stride]
+        complete = ~np.isnan(spans).any(axis=1)
+        stats["skipped"] += int((~complete).sum())
+        spans = spans[complete]
+
+        if len(spans):
+            started = time.perf_counter()
+            forecasts = predict_next_24_hours_batch(spans[:, :N_LAGS], np.full(len(spans), model_location_id))
+            stats["predict_seconds"] += time.perf_counter() - started
+
+            errors = forecasts - spans[:, N_LAGS:]
+            stats["n"] += len(spans)
+            stats["sum_err"] += errors.sum(axis=0)
+            stats["sum_abs"] += np.abs(errors).sum(axis=0)
+            stats["sum_sq"] += (errors ** 2).sum(axis=0)
+
+        chunk_start += chunk
+    return stats
+
+
+def horizon_table(stats):
+    n = max(stats["n"], 1)
+    return pd.DataFrame({
+        "MAE": stats["sum_abs"] / n,
+        "RMSE": np.sqrt(stats["sum_sq"] / n),
+        "bias": stats["sum_err"] / n,
+    }, index=pd.Index([f"t+{h + 1}" for h in range(HORIZON)], name="horizon")).round(3)
+
+
+def run_backtest(data_path=PARQUET_ROOT, location_ids=(0,), start=None, end=None, stride=1,
+                 model_path=MODEL2_PATH, workers=None, report_path=None):
+    """Backtest every location in a process pool; returns (overall table, {location_id: table})."""
+    _check_source(data_path)
+    workers = workers or min(len(location_ids), os.cpu_count() or 1)
+    started = time.time()
+
+    print(f"\n[STEP] Backtesting {len(location_ids)} locations on {workers} processes...")
+    total = {"n": 0, "skipped": 0, "predict_seconds": 0.0,
+             "sum_err": np.zeros(HORIZON), "sum_abs": np.zeros(HORIZON), "sum_sq": np.zeros(HORIZON)}
+    per_location = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+        futures = [pool.submit(backtest_location, data_path, location_id, start, end, stride)
+                   for location_id in location_ids]
+        for future in as_completed(futures):
+            stats = future.result()
+            if stats is None or stats["n"] == 0:
+                continue
+            per_location[stats["location_id"]] = horizon_table(stats)
+            for key in ("n", "skipped", "predict_seconds", "sum_err", "sum_abs", "sum_sq"):
+                total[key] = total[key] + stats[key]
+            print(f"[INFO] location {stats['location_id']}: {stats['n']} forecasts "
+                  f"({stats['skipped']} windows with gaps skipped), "
+                  f"mean MAE {per_location[stats['location_id']]['MAE'].mean():.3f}")
+
+    if total["n"] == 0:
+        print("[INFO] No complete forecast windows in the requested range")
+        return None, per_location
+
+    overall = horizon_table(total)
+    elapsed = time.time() - started
+    print(f"\n[INFO] {total['n']} forecasts in {elapsed:.1f}s wall clock "
+          f"({total['n'] / elapsed:.0f} forecasts/sec end to end, "
+          f"{total['n'] / total['predict_seconds']:.0f} forecasts/sec per worker in the predictor)")
+    print(overall.to_string())
+
+    if report_path:
+        overall.to_csv(report_path)
+        print(f"[INFO] Horizon table written to {report_path}")
+    return overall, per_location
+
+
+if __name__ == "__main__":
+    run_backtest(PARQUET_ROOT, location_ids=list(range(6)), stride=1)
@@ -0,0 +1,63 @@
+# bench_strategies.py
+# Latency / throughput / accuracy of the direct, recursive and hybrid horizon strategies
+# on the held-out tail of a location's history.
+
+import os
+import sys
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.load_predict import load_model as load_direct_model
+from services.load_predict2 import load_model as load_recursive_model
+from services.horizon_strategies import build_strategies
+from preprocess import load_temperature_frame
+from config import MODEL_PATH
+from core.config2 import DATASET_PATH, MODEL2_PATH
+
+HORIZON = 24
+HOLDOUT_FRACTION = 0.2
+LATENCY_CALLS = 200
+
+
+def holdout_windows(data_path, location_id=0, stride=1):
+    # (N, 24) input windows and (N, 24) actual next-24h values from the last 20% of the series
+    df = load_temperature_frame(data_path, location_id=location_id)
+    if 'location_id' in df.columns:
+        df = df[df['location_id'] == location_id]
+    temps = df.sort_values('time')['temperature_2m (°C)'].to_numpy(dtype=np.float64)
+    temps = temps[int(len(temps) * (1 - HOLDOUT_FRACTION)):]
+
+    spans = sliding_window_view(temps, 24 + HORIZON)[::stride]
+    return spans[:, :24], spans[:, 24:]
+
+
+def bench(strategy, windows, actuals, location_id):
+    location_ids = np.full(len(windows), location_id)
+
+    latencies = []
+    for i in range(min(LATENCY_CALLS, len(windows))):
+        start = time.perf_counter()
+        strategy.predict(windows[i], location_id, HORIZON)
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+
+    start = time.perf_counter()
+    forecasts = strategy.predict_batch(windows, location_ids, HORIZON)
+    throughput = len(windows) / (time.perf_counter() - start)
+
+    mae = np.abs(forecasts - actuals).mean(axis=0)
+    print(f"\n[{strategy.name}] p50 {np.percentile(latencies, 50):.2f} ms  p99 {np.percentile(latencies, 99):.2f} ms  "
+          f"batch throughput {throughput:.0f} forecasts/sec  mean MAE {mae.mean():.3f}")
+    print("  MAE by horizon: " + " ".join(f"t+{h + 1}:{m:.2f}" for h, m in enumerate(mae)))
+    return mae
+
+
+if __name__ == "__main__":
+    strategies = build_strategies(load_direct_model(MODEL_PATH), load_recursive_model(MODEL2_PATH), k=6)
+    windows, actuals = holdout_windows(DATASET_PATH, location_id=0)
+    print(f"[INFO] {len(windows)} held-out forecast windows")
+    for strategy in strategies.values():
+        bench(strategy, windows, actuals, location_id=0)
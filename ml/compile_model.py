@@ -0,0 +1,28 @@
+# compile_model.py
+# Export the fitted joblib forests to the flat array format read by services/compiled_forest.py
+
+import os
+import sys
+import time
+import joblib
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.compiled_forest import compile_forest, save_compiled
+from config import MODEL_PATH, COMPILED_MODEL_PATH
+from core.config2 import MODEL2_PATH, COMPILED_MODEL2_PATH
+
+
+def export(model_path, out_dir):
+    print(f"\n[STEP] Compiling {model_path}")
+    start = time.time()
+    model = joblib.load(model_path)
+    forest = compile_forest(model)
+    save_compiled(forest, out_dir)
+    print(f"[INFO] {len(forest.roots)} trees, {len(forest.feature)} nodes, depth {forest.depth}")
+    print(f"[INFO] Saved to: {out_dir} ({round(time.time() - start, 2)} seconds)")
+
+
+if __name__ == "__main__":
+    export(MODEL_PATH, COMPILED_MODEL_PATH)
+    export(MODEL2_PATH, COMPILED_MODEL2_PATH)
@@ -15,3 +15,4 @@ BEST_PARAMS = {
     "n_jobs": -1
 }
 
+COMPILED_MODEL_PATH = "ml/models/temp_next24hr_model_compiled"
@@ -1,2 +1,4 @@
 MODEL2_PATH = "/home/aditya/flask/ml/models/lightweight_singlefeatures_temp_model.joblib"
 DATASET_PATH = "/home/aditya/flask/ml/dataset/open-meteo-18.62N74.00E561m.csv"
+COMPILED_MODEL2_PATH = "/home/aditya/flask/ml/models/lightweight_singlefeatures_temp_model_compiled"
+PARQUET_ROOT = "/home/aditya/flask/ml/dataset/parquet"
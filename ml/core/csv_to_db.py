@@ -1,34 +1,103 @@
 # csv to db
+# Streams the CSV into SQLite in chunks: one executemany + one transaction per chunk,
+# with a progress row committed alongside each chunk so an interrupted load resumes
+# where it stopped. Run from the repo root: python -m ml.core.csv_to_db
+
+import os
+import time
 
 import pandas as pd
-from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app2 import app
+from dbmodles.location import get_location_key
+from dbmodles.migrate import migrate_weather_schema
 from dbmodles.weather import Weather, db
-from app import create_app  # your Flask app factory
 from ml.core.config2 import DATASET_PATH
 
-app = create_app()
-app.app_context().push()  # enable db session context
-
-# Load the CSV
-df = pd.read_csv(DATASET_PATH)
-
-# Convert 'date' column to datetime.date if needed
-df['date'] = pd.to_datetime(df['date']).dt.date
-
-# Loop and insert into DB
-for _, row in df.iterrows():
-    entry = Weather(
-        latitude=row['latitude'],
-        longitude=row['longitude'],
-        date=row['date'],
-        hour=int(row['hour']),
-        temperature_2m=float(row['temperature_2m'])
-    )
-    db.session.add(entry)
-
-try:
-    db.session.commit()
-    print("Data inserted into database.")
-except Exception as e:
-    db.session.rollback()
-    print("Error:", e)
+CHUNK_SIZE = 50_000
+
+
+def _rows_done(conn, source):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS ingest_progress (source TEXT PRIMARY KEY, rows_done INTEGER NOT NULL)"
+    ))
+    done = conn.execute(text("SELECT rows_done FROM ingest_progress WHERE source = :source"),
+                        {"source": source}).scalar()
+    return done or 0
+
+
+def ingest_csv(csv_path=DATASET_PATH, chunk_size=CHUNK_SIZE):
+    source = os.path.abspath(csv_path)
+
+    with app.app_context():
+        migrate_weather_schema()
+        engine = db.engine
+
+        with engine.begin() as conn:
+            rows_done = _rows_done(conn, source)
+        if rows_done:
+            print(f"[INFO] Resuming {csv_path} after {rows_done} rows")
+
+        # Existing rows win, so replaying a partly committed chunk is harmless
+        stmt = sqlite_insert(Weather.__table__).on_conflict_do_nothing(
+            index_elements=['location_id', 'date', 'hour']
+        )
+
+        start = time.time()
+        inserted = 0
+        with engine.connect() as conn:
+            # Bulk-load settings; WAL persists, synchronous is put back afterwards
+            conn.exec_driver_sql("PRAGMA journal_mode=WAL")
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            conn.exec_driver_sql("PRAGMA temp_store=MEMORY")
+            conn.commit()
+            try:
+                reader = pd.read_csv(csv_path, chunksize=chunk_size, skiprows=lambda i: 0 < i <= rows_done)
+                for chunk in reader:
+                    if chunk.empty:
+                        continue
+                    chunk['date'] = pd.to_datetime(chunk['date']).dt.date
+
+                    keys = {}
+                    for lat, lon in chunk[['latitude', 'longitude']].drop_duplicates().itertuples(index=False):
+                        keys[(lat, lon)] = get_location_key(lat, lon)
+                    chunk['location_id'] = [keys[(lat, lon)] for lat, lon in zip(chunk['latitude'], chunk['longitude'])]
+
+                    records = [
+                        {
+                            "latitude": float(lat),
+                            "longitude": float(lon),
+                            "date": day,
+                            "hour": int(hour),
+                            "temperature_2m": float(temp),
+                            "location_id": int(loc),
+                        }
+                        for lat, lon, day, hour, temp, loc in zip(
+                            chunk['latitude'], chunk['longitude'], chunk['date'],
+                            chunk['hour'], chunk['temperature_2m'], chunk['location_id'])
+                    ]
+
+                    with conn.begin():
+                        conn.execute(stmt, records)
+                        rows_done += len(records)
+                        conn.execute(text(
+                            "INSERT INTO ingest_progress (source, rows_done) VALUES (:source, :rows_done) "
+                            "ON CONFLICT(source) DO UPDATE SET rows_done = excluded.rows_done"
+                        ), {"source": source, "rows_done": rows_done})
+
+                    inserted += len(records)
+                    elapsed = time.time() - start
+                    print(f"[INFO] {rows_done} rows loaded ({inserted / elapsed:.0f} rows/sec)")
+            finally:
+                conn.exec_driver_sql("PRAGMA synchronous=NORMAL")
+                conn.commit()
+
+    elapsed = time.time() - start
+    print(f"Data inserted into database: {inserted} rows in {elapsed:.1f}s "
+          f"({inserted / max(elapsed, 1e-9):.0f} rows/sec).")
+
+
+if __name__ == "__main__":
+    ingest_csv()
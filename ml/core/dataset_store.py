@@ -0,0 +1,83 @@
+#dataset_store.py
+# Columnar training-data store: the Open-Meteo CSVs are converted once into Parquet
+# partitioned by location_id/year, then read back with column projection and
+# predicate pushdown so a run only touches the locations and dates it needs.
+
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from core.config2 import DATASET_PATH, PARQUET_ROOT
+
+TIME_COL = 'time'
+CHUNK_SIZE = 500_000
+
+
+def convert_csv_to_parquet(csv_path=DATASET_PATH, root=PARQUET_ROOT, location_id=0, overwrite=False):
+    """Convert an Open-Meteo CSV into the partitioned store under root.
+
+    Files without a location_id column are tagged with the given location_id.
+    """
+    if overwrite and os.path.isdir(root):
+        shutil.rmtree(root)
+
+    partitioning = ds.partitioning(pa.schema([('location_id', pa.int32()), ('year', pa.int16())]), flavor='hive')
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    total = 0
+
+    for i, chunk in enumerate(pd.read_csv(csv_path, chunksize=CHUNK_SIZE)):
+        chunk[TIME_COL] = pd.to_datetime(chunk[TIME_COL])
+        if 'location_id' not in chunk.columns:
+            chunk['location_id'] = location_id
+        chunk['location_id'] = chunk['location_id'].astype('int32')
+        chunk['year'] = chunk[TIME_COL].dt.year.astype('int16')
+        for col in chunk.columns:
+            if col not in (TIME_COL, 'location_id', 'year') and pd.api.types.is_numeric_dtype(chunk[col]):
+                chunk[col] = chunk[col].astype('float64')
+
+        table = pa.Table.from_pandas(chunk.sort_values(['location_id', TIME_COL]), preserve_index=False)
+        ds.write_dataset(
+            table, root, format='parquet', partitioning=partitioning,
+            basename_template=f"{stem}-{i}-{{i}}.parquet",
+            existing_data_behavior='overwrite_or_ignore',
+        )
+        total += len(chunk)
+
+    print(f"[INFO] Wrote {total} rows from {csv_path} to {root}")
+    return root
+
+
+def load_dataset(root=PARQUET_ROOT, columns=None, location_ids=None, start=None, end=None):
+    """Read the store back as a DataFrame sorted by location and time.
+
+    columns limits what is read from disk; location_ids and the start/end datetimes
+    are pushed down so whole partitions and row groups are skipped.
+    """
+    dataset = ds.dataset(root, format='parquet', partitioning='hive')
+
+    condition = None
+
+    def _and(expr):
+        return expr if condition is None else condition & expr
+
+    if location_ids is not None:
+        condition = _and(ds.field('location_id').isin(list(location_ids)))
+    if start is not None:
+        start = pd.Timestamp(start)
+        condition = _and((ds.field('year') >= start.year) & (ds.field(TIME_COL) >= start.to_pydatetime()))
+    if end is not None:
+        end = pd.Timestamp(end)
+        condition = _and((ds.field('year') <= end.year) & (ds.field(TIME_COL) <= end.to_pydatetime()))
+
+    if columns is not None:
+        columns = list(dict.fromkeys(['location_id', TIME_COL, *columns]))
+
+    df = dataset.to_table(columns=columns, filter=condition).to_pandas()
+    return df.sort_values(['location_id', TIME_COL]).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    convert_csv_to_parquet(overwrite=True)
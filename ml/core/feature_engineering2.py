@@ -1,6 +1,7 @@
 #feature_engineering2.py
 
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
 def add_time_features(df):
     df['hour'] = df['date_time'].dt.hour
@@ -26,3 +27,43 @@ def create_supervised_with_features(df, target_col, feature_cols, window=24):
             features.append(full_features)
             targets.append(group.iloc[i][target_col])
     return np.array(features), np.array(targets)
+
+def create_supervised_windows(df, target_col, feature_cols, window=24, horizon=1, return_times=False):
+    # Same rows as create_supervised_with_features, built with strided views per location
+    # instead of a Python loop over every row. horizon > 1 gives (N, horizon) targets.
+    # Rows come out grouped by location; return_times adds each row's (first) target
+    # timestamp so callers can put them in time order before any time-based split.
+    features, targets, times = [], [], []
+    grouped = df.groupby('location_id')
+    for loc, group in grouped:
+        group = group.sort_values('date_time')
+        n_samples = len(group) - window - horizon + 1
+        if n_samples <= 0:
+            continue
+
+        values = group[feature_cols].to_numpy()
+        # (len - window + 1, n_features, window) -> (n_samples, window * n_features), row-major like flatten()
+        windows = sliding_window_view(values, window, axis=0)[:n_samples]
+        window_data = windows.transpose(0, 2, 1).reshape(n_samples, window * len(feature_cols))
+
+        block = np.empty((n_samples, window_data.shape[1] + 1), dtype=np.result_type(window_data.dtype, np.float64))
+        block[:, :-1] = window_data
+        block[:, -1] = loc
+        features.append(block)
+
+        times.append(group['date_time'].to_numpy()[window:window + n_samples])
+
+        target = group[target_col].to_numpy()
+        if horizon == 1:
+            targets.append(target[window:window + n_samples])
+        else:
+            targets.append(sliding_window_view(target[window:], horizon)[:n_samples])
+
+    if not features:
+        width = window * len(feature_cols) + 1
+        X, y, t = np.empty((0, width)), np.empty((0,) if horizon == 1 else (0, horizon)), np.empty(0, dtype='datetime64[ns]')
+    else:
+        X, y, t = np.concatenate(features), np.concatenate(targets), np.concatenate(times)
+    if return_times:
+        return X, y, t
+    return X, y
@@ -1,22 +1,25 @@
 #modeling2.py
 
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import RandomizedSearchCV
 
-def train_random_forest(X_train, y_train, param_dist=None):
+from core.search2 import halving_time_series_search
+
+def train_random_forest(X_train, y_train, param_dist=None, trace_path=None, times=None):
     base_model = RandomForestRegressor(random_state=42)
     if param_dist:
-        random_search = RandomizedSearchCV(
-            base_model,
-            param_distributions=param_dist,
+        # Expanding-window CV with successive halving; the trace lets an interrupted search resume
+        best_params, _ = halving_time_series_search(
+            X_train, y_train,
+            param_dist=param_dist,
             n_iter=20,
-            cv=3,
-            n_jobs=-1,
-            scoring='neg_mean_squared_error',
-            random_state=42
+            n_splits=3,
+            trace_path=trace_path,
+            random_state=42,
+            times=times
         )
-        random_search.fit(X_train, y_train)
-        return random_search.best_estimator_, random_search.best_params_
+        best_model = RandomForestRegressor(random_state=42, n_jobs=-1, **best_params)
+        best_model.fit(X_train, y_train)
+        return best_model, best_params
     else:
         base_model.fit(X_train, y_train)
         return base_model, base_model.get_params()
@@ -0,0 +1,107 @@
+#search2.py
+# Time-series hyperparameter search: expanding-window TimeSeriesSplit folds (no future
+# rows in any training set) with successive halving over the training budget, so
+# weak configs are dropped after cheap fits on recent data. Every evaluated
+# (config, budget) score is appended to a JSONL trace; rerunning with the same trace
+# file skips what is already there.
+
+import json
+import os
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import ParameterSampler, TimeSeriesSplit
+
+
+def _load_trace(trace_path):
+    done = {}
+    if trace_path and os.path.exists(trace_path):
+        with open(trace_path) as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    done[(json.dumps(entry["params"], sort_keys=True), entry["budget"])] = entry["score"]
+    return done
+
+
+def _append_trace(trace_path, entry):
+    if trace_path:
+        with open(trace_path, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def _score(params, folds, X, y, budget):
+    # Mean validation MSE over the folds, each trained on its latest `budget` rows
+    scores = []
+    for train_idx, val_idx in folds:
+        train_idx = train_idx[-budget:]
+        model = RandomForestRegressor(random_state=42, n_jobs=-1, **params)
+        model.fit(X[train_idx], y[train_idx])
+        scores.append(mean_squared_error(y[val_idx], model.predict(X[val_idx])))
+    return float(np.mean(scores))
+
+
+def _time_folds(times, n_splits):
+    # Expanding-window folds over distinct timestamps (rows must be sorted by time), so
+    # no validation row is earlier than a training row, whichever location it is from
+    unique_times = np.unique(times)
+    folds = []
+    for train_t, val_t in TimeSeriesSplit(n_splits=n_splits).split(unique_times):
+        train_end = np.searchsorted(times, unique_times[train_t[-1]], side='right')
+        val_end = np.searchsorted(times, unique_times[val_t[-1]], side='right')
+        folds.append((np.arange(train_end), np.arange(train_end, val_end)))
+    return folds
+
+
+def halving_time_series_search(X, y, param_dist, n_iter=20, n_splits=3, factor=3,
+                               min_budget=100, trace_path=None, random_state=42, times=None):
+    """Return (best_params, trace) from successive halving over expanding-window CV.
+
+    times gives each row's target timestamp. Multi-location data needs it; without it,
+    rows are assumed to already be in time order.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+
+    # Fold indices are computed once; X/y are already built, so configs share them
+    if times is not None:
+        order = np.argsort(times, kind='stable')
+        X, y, times = X[order], y[order], np.asarray(times)[order]
+        folds = _time_folds(times, n_splits)
+    else:
+        folds = list(TimeSeriesSplit(n_splits=n_splits).split(X))
+    max_budget = min(len(train_idx) for train_idx, _ in folds)
+    configs = list(ParameterSampler(param_dist, n_iter=n_iter, random_state=random_state))
+
+    # One rung per factor-fold cut in configs; budgets grow by factor up to the full fold
+    n_rungs = 1
+    while len(configs) // factor ** n_rungs >= 1 and n_rungs < 10:
+        n_rungs += 1
+    budgets = [max(max_budget // factor ** k, min(min_budget, max_budget)) for k in reversed(range(n_rungs))]
+
+    done = _load_trace(trace_path)
+    trace = []
+    survivors = list(range(len(configs)))
+
+    for rung, budget in enumerate(budgets):
+        rung_scores = []
+        for config_id in survivors:
+            # keyed by the params themselves, so a trace from another param_dist can't be misread
+            key = (json.dumps(configs[config_id], sort_keys=True), budget)
+            if key in done:
+                score = done[key]
+            else:
+                score = _score(configs[config_id], folds, X, y, budget)
+                _append_trace(trace_path, {"config_id": config_id, "budget": budget,
+                                           "params": configs[config_id], "score": score})
+            trace.append({"config_id": config_id, "budget": budget, "params": configs[config_id], "score": score})
+            rung_scores.append((score, config_id))
+        rung_scores.sort()
+        print(f"[INFO] budget {budget}: {len(survivors)} configs, best MSE {rung_scores[0][0]:.4f}")
+
+        if rung < len(budgets) - 1:
+            survivors = [config_id for _, config_id in rung_scores[:max(1, len(survivors) // factor)]]
+
+    best_score, best_id = rung_scores[0]
+    return configs[best_id], trace
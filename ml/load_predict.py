@@ -3,18 +3,27 @@
 import numpy as np
 import joblib
 import pandas as pd
-import sys
+import os
+
+from services.compiled_forest import CompiledForest, load_compiled
+from services.memory_report import memory_report
 
 _model = None  
 
 
-def load_model(model_path="/home/aditya/flask/ml/models/temp_next24hr_model.joblib"):
+def load_model(model_path="/home/aditya/flask/ml/models/temp_next24hr_model.joblib", mmap_mode="r"):
     global _model
     if _model is None:
         print("Loading model")
-        _model = joblib.load(model_path)
+        if os.path.isdir(model_path):
+            # Flat array export from ml/compile_model.py, no sklearn needed
+            _model = load_compiled(model_path, mmap_mode=mmap_mode)
+        else:
+            # sklearn's Tree copies its node arrays on unpickling, so a joblib forest is
+            # always a private copy per process; mmap_mode only applies to the compiled export
+            _model = joblib.load(model_path)
         print("Model loaded")
-        print("Estimated size in RAM:", sys.getsizeof(_model))
+        print("Estimated size in RAM:", memory_report(_model))
     return _model
 
 def predict_next_24_hours(past_24_temps):
@@ -22,7 +31,11 @@ def predict_next_24_hours(past_24_temps):
         raise ValueError("Exactly 24 hourly temperature values are required.")
 
     model = load_model()
-    
+
+    if isinstance(model, CompiledForest):
+        prediction = model.predict(np.asarray([past_24_temps], dtype=np.float32))
+        return [round(p, 2) for p in prediction.flatten().tolist()]
+
     # Match exact feature names used during training
     feature_names = [f"temp_t-{i}" for i in range(1, 25)] 
     
@@ -1,27 +1,83 @@
 #preprocess.py
+import os
+import sqlite3
 import pandas as pd
 
-def preprocess_temperature_data(csv_path):
-    print(f"\n[INFO] Reading CSV: {csv_path}")
-    df = pd.read_csv(csv_path)
+from core.dataset_store import load_dataset
+
+
+def load_temperature_frame(data_path, location_id=None, start=None, end=None):
+    # A directory is the partitioned Parquet store (already typed, filters pushed down);
+    # anything else is the raw Open-Meteo CSV
+    if data_path.endswith(".db"):
+        print(f"\n[INFO] Reading SQLite: {data_path}")
+        df = _read_sqlite(data_path, location_id, start, end)
+    elif os.path.isdir(data_path):
+        print(f"\n[INFO] Reading Parquet store: {data_path}")
+        location_ids = None if location_id is None else [location_id]
+        df = load_dataset(data_path, columns=['temperature_2m (°C)'], location_ids=location_ids, start=start, end=end)
+    else:
+        print(f"\n[INFO] Reading CSV: {data_path}")
+        df = pd.read_csv(data_path)
+        if start is not None or end is not None:
+            times = pd.to_datetime(df['time'])
+            keep = pd.Series(True, index=df.index)
+            if start is not None:
+                keep &= times >= pd.Timestamp(start)
+            if end is not None:
+                keep &= times <= pd.Timestamp(end)
+            df = df[keep]
     print("Original DataFrame shape:", df.shape)
+    return df
+
+
+def _read_sqlite(db_path, location_id=None, start=None, end=None):
+    # Hourly rows from the app's weather table (location_id is the grid-cell key there).
+    # The table holds windows for many cells, so one cell has to be picked.
+    if location_id is None:
+        raise ValueError("location_id (the grid-cell key) is required for the SQLite source")
+    query = "SELECT date, hour, temperature_2m FROM weather WHERE temperature_2m IS NOT NULL"
+    params = []
+    query += " AND location_id = ?"
+    params.append(location_id)
+    if start is not None:
+        query += " AND date >= ?"
+        params.append(pd.Timestamp(start).date().isoformat())
+    if end is not None:
+        query += " AND date <= ?"
+        params.append(pd.Timestamp(end).date().isoformat())
+
+    with sqlite3.connect(db_path) as conn:
+        df = pd.read_sql_query(query, conn, params=params)
+    df['time'] = pd.to_datetime(df['date']) + pd.to_timedelta(df['hour'], unit='h')
+    return df[['time', 'temperature_2m']].rename(columns={'temperature_2m': 'temperature_2m (°C)'})
 
-    # Rename and sort
-    df.rename(columns={'temperature_2m (°C)': 'temperature', 'time': 'datetime'}, inplace=True)
+
+def build_lag_targets(df):
+    # Rename
+    df = df.rename(columns={'temperature_2m (°C)': 'temperature', 'time': 'datetime'})
     df['datetime'] = pd.to_datetime(df['datetime'])
-    df = df.sort_values('datetime').reset_index(drop=True)
-    print("[INFO] Converted datetime and sorted. Shape:", df.shape)
+    groups = [group for _, group in df.groupby('location_id')] if 'location_id' in df.columns and len(df) else [df]
+    print("[INFO] Converted datetime. Shape:", df.shape)
+
+    frames = []
+    for group in groups:
+        # Windows are built per location on a complete hourly grid: a missing hour becomes
+        # NaN, so any window spanning a gap is dropped instead of silently shifting
+        temps = group.drop_duplicates('datetime').set_index('datetime').sort_index()['temperature'].asfreq('h')
+        frame = pd.DataFrame({'datetime': temps.index, 'temperature': temps.to_numpy()})
 
-    # Add lag features (past 24 hours)
-    for i in range(1, 25):
-        df[f'temp_t-{i}'] = df['temperature'].shift(i)
+        # Add lag features (past 24 hours)
+        for i in range(1, 25):
+            frame[f'temp_t-{i}'] = frame['temperature'].shift(i)
 
-    # Add multi-step targets (next 48 hours)
-    for i in range(0, 25):
-        df[f'target_t+{i+1}'] = df['temperature'].shift(-(i+1))
+        # Add multi-step targets (next 48 hours)
+        for i in range(0, 25):
+            frame[f'target_t+{i+1}'] = frame['temperature'].shift(-(i+1))
+        frames.append(frame)
 
     # Drop rows with NaNs
-    df = df.dropna().reset_index(drop=True)
+    df = pd.concat(frames, ignore_index=True).dropna().reset_index(drop=True)
     print("[INFO] Dropped NaNs. Final usable shape:", df.shape)
 
     # Prepare features and multi-output targets
@@ -32,3 +88,7 @@ def preprocess_temperature_data(csv_path):
     y = df[target_cols]
 
     return X, y
+
+
+def preprocess_temperature_data(csv_path, location_id=None, start=None, end=None):
+    return build_lag_targets(load_temperature_frame(csv_path, location_id, start, end))
@@ -3,3 +3,8 @@
 from train import train_and_save_model
 
 train_and_save_model("/home/aditya/flask/ml/dataset/open-meteo-18.62N74.00E561m.csv")
+
+# Daily refresh: grow extra trees on the last week instead of refitting everything
+# from train import train_incremental
+# from datetime import datetime, timedelta
+# train_incremental("/home/aditya/flask/ml/dataset/parquet", since=datetime.now() - timedelta(days=7))
@@ -1,7 +1,11 @@
 ## train.py
 import os
+import json
 import time
+from datetime import datetime
 import joblib
+import numpy as np
+import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.multioutput import MultiOutputRegressor
 from sklearn.model_selection import train_test_split
@@ -14,7 +18,7 @@ from sklearn.metrics import (
     explained_variance_score
 )
 
-from preprocess import preprocess_temperature_data
+from preprocess import preprocess_temperature_data, load_temperature_frame, build_lag_targets
 from config import MODEL_PATH, BEST_PARAMS
 
 
@@ -24,7 +28,7 @@ def evaluation(model, X_test, y_test, model_path, start_time):
 
     print(f"MAE  : {mean_absolute_error(y_test, y_pred):.4f}")
     print(f"MSE  : {mean_squared_error(y_test, y_pred):.4f}")
-    print(f"RMSE : {mean_squared_error(y_test, y_pred, squared=False):.4f}")
+    print(f"RMSE : {np.sqrt(mean_squared_error(y_test, y_pred)):.4f}")
     print(f"R2   : {r2_score(y_test, y_pred):.4f}")
     print(f"MedAE: {median_absolute_error(y_test, y_pred):.4f}")
     print(f"MAPE : {mean_absolute_percentage_error(y_test, y_pred):.4f}")
@@ -54,3 +58,58 @@ def train_and_save_model(csv_path):
     model.fit(X_train, y_train)
 
     evaluation(model, X_test, y_test, MODEL_PATH, start_time)
+
+
+def versioned_path(model_path, version):
+    root, ext = os.path.splitext(model_path)
+    return f"{root}.{version}{ext}"
+
+
+def train_incremental(data_path, since, base_model_path=MODEL_PATH, extra_trees=8, horizons=None, location_id=None):
+    """Grow extra trees on windows whose targets fall after `since`, instead of a full refit.
+
+    data_path is the Parquet store, a CSV, or the app's SQLite db (one grid cell at a time,
+    so location_id is required there). horizons limits the
+    update to some of the 24 output models (0-based); by default all of them get new trees.
+    The result is saved as a new version next to base_model_path, which is left untouched.
+    """
+    start_time = time.time()
+    since = pd.Timestamp(since)
+
+    print("\n[STEP] Loading base model...")
+    model = joblib.load(base_model_path)
+
+    print("\n[STEP] Loading new data...")
+    # 24 lag hours before `since` are needed to build its first window
+    X, y = build_lag_targets(load_temperature_frame(data_path, location_id, start=since - pd.Timedelta(hours=24)))
+    if len(X) == 0:
+        print("[INFO] No new windows, nothing to do.")
+        return base_model_path
+
+    horizons = range(len(model.estimators_)) if horizons is None else horizons
+    print(f"\n[STEP] Growing {extra_trees} trees on {len(X)} new windows for {len(horizons)} horizons...")
+    for h in horizons:
+        forest = model.estimators_[h]
+        forest.set_params(warm_start=True, n_estimators=forest.n_estimators + extra_trees)
+        forest.fit(X, y.iloc[:, h])
+        forest.set_params(warm_start=False)
+
+    version = datetime.now().strftime("%Y%m%d%H%M%S")
+    new_path = versioned_path(base_model_path, version)
+    joblib.dump(model, new_path, compress=3)
+
+    manifest = {
+        "version": version,
+        "path": new_path,
+        "base_model": base_model_path,
+        "since": since.isoformat(),
+        "new_windows": len(X),
+        "horizons_updated": list(horizons),
+        "extra_trees": extra_trees,
+    }
+    with open(os.path.join(os.path.dirname(base_model_path), "latest_model.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"[INFO] Model version {version} saved to: {new_path}")
+    print(f"[INFO] Incremental training time: {round(time.time() - start_time, 2)} seconds")
+    return new_path
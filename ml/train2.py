@@ -1,5 +1,7 @@
 #train2.py
 
+import os
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 import joblib
@@ -7,13 +9,17 @@ import time
 
 
 from core.preprocess2 import remove_outliers_iqr, scale_features
-from core.feature_engineering2 import add_time_features, create_supervised_with_features
+from core.feature_engineering2 import add_time_features, create_supervised_windows
 from core.modeling2 import train_random_forest
 from core.evaluate2 import evaluate_model
-from core.config2 import DATASET_PATH, MODEL2_PATH
-
-# Load and preprocess data
-df = pd.read_csv(DATASET_PATH)
+from core.config2 import DATASET_PATH, MODEL2_PATH, PARQUET_ROOT
+from core.dataset_store import load_dataset
+
+# Load and preprocess data (Parquet store from core/dataset_store.py when it has been built)
+if os.path.isdir(PARQUET_ROOT):
+    df = load_dataset(PARQUET_ROOT, columns=['temperature_2m (°C)'])
+else:
+    df = pd.read_csv(DATASET_PATH)
 df['date_time'] = pd.to_datetime(df['time'])
 
 df_clean = remove_outliers_iqr(df, exclude_columns=['location_id'])
@@ -24,8 +30,12 @@ feature_cols = [
 ]
 
 # Create supervised dataset
-X, y = create_supervised_with_features(df_clean, target_col='temperature_2m (°C)', feature_cols=feature_cols, window=24)
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, shuffle=False)
+X, y, times = create_supervised_windows(df_clean, target_col='temperature_2m (°C)', feature_cols=feature_cols,
+                                       window=24, return_times=True)
+# Rows come grouped by location; time order makes the split (and the search folds) chronological
+order = np.argsort(times, kind='stable')
+X, y, times = X[order], y[order], times[order]
+X_train, X_test, y_train, y_test, times_train, _ = train_test_split(X, y, times, test_size=0.2, shuffle=False)
 
 # Hyperparameter space
 param_dist = {
@@ -38,7 +48,8 @@ param_dist = {
 
 # Train model
 start = time.time()
-model, best_params = train_random_forest(X_train, y_train, param_dist)
+model, best_params = train_random_forest(X_train, y_train, param_dist, trace_path=MODEL2_PATH + ".search_trace.jsonl",
+                                         times=times_train)
 print(f"[INFO] Best Hyperparameters: {best_params}")
 print(f"[INFO] Training Time: {round(time.time() - start, 2)}s")
 
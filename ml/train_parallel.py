@@ -0,0 +1,84 @@
+## train_parallel.py
+# Fits the 24 horizon forests across a process pool. X and y are written once to
+# .npy files and every worker memory-maps them read-only, so the feature matrix is
+# never copied per horizon. The result is the same MultiOutputRegressor that
+# train.py produces and ml/load_predict.load_model expects.
+
+import os
+import time
+import resource
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.multioutput import MultiOutputRegressor
+from sklearn.model_selection import train_test_split
+
+from preprocess import preprocess_temperature_data
+from config import MODEL_PATH, BEST_PARAMS
+from train import evaluation
+
+_X = None
+_y = None
+
+
+def _init_worker(x_path, y_path):
+    global _X, _y
+    _X = np.load(x_path, mmap_mode="r")
+    _y = np.load(y_path, mmap_mode="r")
+
+
+def _fit_horizon(h, params):
+    start = time.time()
+    forest = RandomForestRegressor(**params)
+    # float32 C-ordered is what the trees use internally, so fit works on the mapping directly
+    forest.fit(_X, _y[:, h])
+    fit_time = time.time() - start
+    # ru_maxrss is the worker's peak over its whole life so far, not this horizon's own
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return h, forest, fit_time, peak_mb
+
+
+def train_parallel(csv_path, model_path=MODEL_PATH, workers=None):
+    start_time = time.time()
+    print("\n[STEP] Loading and preprocessing data...")
+    X, y = preprocess_temperature_data(csv_path)
+    feature_names = np.asarray(X.columns, dtype=object)
+
+    print("\n[STEP] Splitting dataset...")
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    workers = workers or min(y.shape[1], os.cpu_count() or 1)
+    params = dict(BEST_PARAMS, n_jobs=max(1, (os.cpu_count() or 1) // workers))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        x_path = os.path.join(tmp, "X.npy")
+        y_path = os.path.join(tmp, "y.npy")
+        np.save(x_path, np.ascontiguousarray(X_train.to_numpy(), dtype=np.float32))
+        np.save(y_path, np.ascontiguousarray(y_train.to_numpy(), dtype=np.float64))
+
+        print(f"\n[STEP] Fitting {y.shape[1]} horizons on {workers} processes...")
+        forests = [None] * y.shape[1]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(x_path, y_path)) as pool:
+            futures = [pool.submit(_fit_horizon, h, params) for h in range(y.shape[1])]
+            for future in as_completed(futures):
+                h, forest, fit_time, peak_mb = future.result()
+                forests[h] = forest
+                print(f"[INFO] horizon t+{h + 1}: fit {fit_time:.2f}s, worker peak RSS so far {peak_mb:.0f} MB")
+
+    # Assemble the fitted forests into the MultiOutputRegressor train.py would have built.
+    # Workers fit on arrays, so the DataFrame column names are restored for predict.
+    model = MultiOutputRegressor(RandomForestRegressor(**BEST_PARAMS))
+    model.estimators_ = forests
+    model.n_features_in_ = len(feature_names)
+    model.feature_names_in_ = feature_names
+    for forest in forests:
+        forest.feature_names_in_ = feature_names
+        forest.set_params(n_jobs=BEST_PARAMS["n_jobs"])
+
+    evaluation(model, X_test, y_test, model_path, start_time)
+    return model
+
+
+if __name__ == "__main__":
+    train_parallel("/home/aditya/flask/ml/dataset/open-meteo-18.62N74.00E561m.csv")
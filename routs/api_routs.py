@@ -0,0 +1,158 @@
+#api_routs.py
+# JSON API over the same forecast cache the HTML pages use. Responses carry an ETag
+# built from (location cell, issue hour, model version) and a Cache-Control lifetime
+# that runs out at the next issue hour, so clients and proxies revalidate cheaply.
+# Several locations in one request are streamed back as NDJSON, one line each.
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+
+from dateutil import parser
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+
+from dbmodles.location import get_location_key
+from routs.main_routs2 import build_comparison_table
+from services.forecast_cache import get_forecast, issue_hour
+from services.geocode import get_coordinates
+from services.load_predict2 import model_version
+from services.locations import get_nearest_location_id
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+# Forecasts for an hour that has already passed no longer change for a given model
+SETTLED_MAX_AGE = 24 * 3600
+
+
+def _issue_time():
+    at = request.args.get('at')
+    if not at:
+        return datetime.now()
+    issue_time = parser.parse(at)
+    if issue_time.tzinfo is not None:
+        # everything else here is naive local time
+        issue_time = issue_time.astimezone().replace(tzinfo=None)
+    return issue_time
+
+
+def _targets():
+    # [(label, lat, lon)] from ?location=Pune&location=Satara (or comma separated)
+    # and/or repeated ?lat=..&lon=.. pairs; lat/lon of None marks an unknown location.
+    # Raises ValueError for lat/lon that can't be paired up.
+    lats, lons = request.args.getlist('lat'), request.args.getlist('lon')
+    if len(lats) != len(lons):
+        raise ValueError("'lat' and 'lon' must be given the same number of times")
+    try:
+        coords = [(float(lat), float(lon)) for lat, lon in zip(lats, lons)]
+    except ValueError:
+        raise ValueError("Invalid 'lat' or 'lon'")
+
+    targets = []
+    for value in request.args.getlist('location'):
+        for name in filter(None, (part.strip() for part in value.split(','))):
+            lat, lon = get_coordinates(name)
+            targets.append((name, lat, lon))
+    for lat, lon in coords:
+        targets.append((f"{lat},{lon}", lat, lon))
+    return targets
+
+
+def _etag(kind, lat, lon, issue_time):
+    key = f"{kind}:{get_location_key(lat, lon)}:{issue_hour(issue_time).isoformat(timespec='minutes')}:{model_version()}"
+    return hashlib.sha1(key.encode()).hexdigest()[:20]
+
+
+def _max_age(issue_time):
+    now = datetime.now()
+    next_hour = issue_hour(now) + timedelta(hours=1)
+    if issue_time < issue_hour(now):
+        return SETTLED_MAX_AGE
+    return max(0, int((next_hour - now).total_seconds()))
+
+
+def _cached_response(body, etag, issue_time):
+    response = jsonify(body) if body is not None else Response(status=304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f"public, max-age={_max_age(issue_time)}"
+    return response
+
+
+def _forecast_body(label, lat, lon, issue_time):
+    if lat is None:
+        return {"location": label, "error": "Invalid location"}
+
+    forecast = get_forecast(lat, lon, issue_time, get_nearest_location_id(lat, lon))
+    if forecast is None:
+        return {"location": label, "error": "Not enough temperature data available."}
+
+    last_time = datetime.fromisoformat(forecast["last_time"])
+    return {
+        "location": label,
+        "latitude": lat,
+        "longitude": lon,
+        "issue_hour": issue_hour(issue_time).isoformat(timespec="minutes"),
+        "model_version": model_version(),
+        "hours": [(last_time + timedelta(hours=i + 1)).isoformat(timespec="minutes")
+                  for i in range(len(forecast["predictions"]))],
+        "temperatures": forecast["predictions"],
+    }
+
+
+def _analysis_body(label, lat, lon, issue_time):
+    body = _forecast_body(label, lat, lon, issue_time)
+    if "error" in body:
+        return body
+
+    start_dt = datetime.fromisoformat(body["hours"][0])
+    end_dt = datetime.fromisoformat(body["hours"][-1])
+    table = build_comparison_table(body["temperatures"], lat, lon, start_dt, end_dt)
+    # the HTML table shows "N/A" for providers that didn't answer; JSON clients get null
+    body["comparison"] = [{k: (None if v == "N/A" else v) for k, v in row.items()} for row in table]
+    return body
+
+
+def _ndjson(build, targets, issue_time):
+    def generate():
+        for label, lat, lon in targets:
+            yield json.dumps(build(label, lat, lon, issue_time)) + "\n"
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+def _serve(kind, build):
+    try:
+        issue_time = _issue_time()
+    except (ValueError, OverflowError):
+        return jsonify(error="Invalid 'at' timestamp"), 400
+
+    try:
+        targets = _targets()
+    except ValueError as e:
+        return jsonify(error=str(e)), 400
+    if not targets:
+        return jsonify(error="'location' or 'lat' and 'lon' are required"), 400
+
+    if len(targets) > 1 or request.args.get('stream') == '1':
+        return _ndjson(build, targets, issue_time)
+
+    label, lat, lon = targets[0]
+    if lat is None:
+        return jsonify(error="Invalid location"), 404
+
+    etag = _etag(kind, lat, lon, issue_time)
+    if etag in request.if_none_match:
+        return _cached_response(None, etag, issue_time)
+
+    body = build(label, lat, lon, issue_time)
+    if "error" in body:
+        return jsonify(error=body["error"]), 422
+    return _cached_response(body, etag, issue_time)
+
+
+@api.route('/forecast', methods=['GET'])
+def forecast():
+    return _serve("forecast", _forecast_body)
+
+
+@api.route('/analysis', methods=['GET'])
+def analysis():
+    return _serve("analysis", _analysis_body)
@@ -1,37 +1,19 @@
-from flask import Blueprint, render_template, request
+from flask import Blueprint, render_template, request, jsonify
 from datetime import datetime, date as dt_date, timedelta
-from dbmodles.weather import db, Weather
+from dbmodles.location import get_location_key
+from dbmodles.weather import fetch_hourly_range
 from services.geocode import get_coordinates
-from services.weather_api import fetch_temperature_data
-from services.load_predict2 import predict_next_24_hours
+from services.forecast_cache import get_forecast
+from services.forecast_store import load_forecast, save_forecast, update_forecast
+from services.load_predict2 import predict_next_24_hours_batch
+from services.locations import get_nearest_location_id, get_nearest_location_ids
+from services.providers import compare_providers
 import numpy as np
-import requests
 import traceback
 from dateutil import parser
 
 main = Blueprint('main', __name__)
 
-# ✅ Known training locations
-known_locations = {
-    0: (18.5204, 73.8567),  # Pune 1
-    1: (18.5036, 73.8077),  # Pune 2
-    2: (18.1850, 75.7394),  # Satara 1
-    3: (17.6599, 75.9064),  # Satara 2
-    4: (17.2892, 74.1811),  # Kolhapur 1
-    5: (16.9902, 74.2295),  # Kolhapur 2
-}
-
-# ✅ Helper to get nearest location ID
-def get_nearest_location_id(lat, lon):
-    min_dist = float('inf')
-    closest_id = None
-    for loc_id, (known_lat, known_lon) in known_locations.items():
-        dist = ((lat - known_lat) ** 2 + (lon - known_lon) ** 2) ** 0.5
-        if dist < min_dist:
-            min_dist = dist
-            closest_id = loc_id
-    return closest_id
-
 @main.route('/', methods=['GET'])
 def home():
     return render_template("home.html")
@@ -63,15 +45,21 @@ def predictions():
             now = datetime.now()
             forecast_target_time = now
 
-            start_date, end_date, past_24_temps, times = fetch_temperature_data(lat, lon, now.date(), end_time=now)
+            forecast = get_forecast(lat, lon, now, location_id)
 
-            if not past_24_temps or len(past_24_temps) < 24:
+            if forecast is None:
                 return render_template("home.html", error="Not enough temperature data for next 24 hours.", timestamp=datetime.now())
 
-            full_predictions = predict_next_24_hours(past_24_temps, location_id)
+            full_predictions = forecast["predictions"]
             hours_list = [(now + timedelta(hours=i + 1)).strftime("%H:%M") for i in range(len(full_predictions))]
 
+            forecast_id = save_forecast({
+                "latitude": lat, "longitude": lon, "predictions": full_predictions,
+                "start": now.isoformat(), "end": (now + timedelta(hours=23)).isoformat(),
+            })
+
             return render_template("predictions.html",
+                                   forecast_id=forecast_id,
                                    latitude=lat,
                                    longitude=lon,
                                    date=f"{now.strftime('%Y-%m-%d %H:%M')} to {(now + timedelta(hours=23)).strftime('%Y-%m-%d %H:%M')}",
@@ -95,48 +83,28 @@ def predictions():
             return render_template("home.html", error="Invalid date format", timestamp=datetime.now())
 
         forecast_target_time = datetime.combine(selected_date, datetime.min.time()) + timedelta(hours=to_hour)
-        start_date, end_date, past_24_temps, times = fetch_temperature_data(lat, lon, forecast_target_time.date(), end_time=forecast_target_time)
+        forecast = get_forecast(lat, lon, forecast_target_time, location_id)
 
-        if not past_24_temps or len(past_24_temps) < 24:
+        if forecast is None:
             return render_template("home.html", error="Not enough temperature data available.", timestamp=datetime.now())
 
-        # UPSERT into DB
-        for i in range(len(times) - 24, len(times)):
-            dt_obj = datetime.fromisoformat(times[i])
-            temperature = past_24_temps[i - (len(times) - 24)]
-
-            existing_record = db.session.query(Weather).filter_by(
-                latitude=lat,
-                longitude=lon,
-                date=dt_obj.date(),
-                hour=dt_obj.hour
-            ).first()
-
-            if existing_record:
-                existing_record.temperature_2m = temperature
-                existing_record.location_id = location_id
-            else:
-                new_record = Weather(
-                    latitude=lat,
-                    longitude=lon,
-                    date=dt_obj.date(),
-                    hour=dt_obj.hour,
-                    temperature_2m=temperature,
-                    location_id=location_id
-                )
-                db.session.add(new_record)
-        db.session.commit()
-
-        full_predictions = predict_next_24_hours(past_24_temps, location_id)
-
-        last_time = datetime.fromisoformat(times[-1])
+        full_predictions = forecast["predictions"]
+
+        last_time = datetime.fromisoformat(forecast["last_time"])
         full_hours = [(last_time + timedelta(hours=i + 1)).hour for i in range(len(full_predictions))]
 
         selected_hours = list(range(from_hour, to_hour + 1))
         predictions = [full_predictions[i] for i in selected_hours]
         hours_list = [f"{full_hours[i]}:00" for i in selected_hours]
 
+        forecast_id = save_forecast({
+            "latitude": lat, "longitude": lon, "predictions": predictions,
+            "start": datetime.combine(selected_date, datetime.min.time()).isoformat(),
+            "end": datetime.combine(selected_date, datetime.max.time()).isoformat(),
+        })
+
         return render_template("predictions.html",
+                               forecast_id=forecast_id,
                                latitude=lat,
                                longitude=lon,
                                date=forecast_target_time.date().strftime('%Y-%m-%d'),
@@ -149,9 +117,94 @@ def predictions():
         print("Error in /predictions route:", traceback.format_exc())
         return render_template("home.html", error="An error occurred while processing your request.", timestamp=datetime.now())
 
+@main.route('/predictions/bulk', methods=['POST'])
+def predictions_bulk():
+    # JSON body: {"windows": [[24 temps], ...], "location_ids": [id, ...]}
+    # or "coords": [[lat, lon], ...] instead of location_ids to use the nearest known location
+    payload = request.get_json(silent=True) or {}
+    windows = payload.get('windows')
+    location_ids = payload.get('location_ids')
+    if location_ids is None and payload.get('coords'):
+        try:
+            coords = np.asarray(payload['coords'], dtype=np.float64)
+            if coords.ndim != 2 or coords.shape[1] != 2:
+                raise ValueError
+            location_ids, _ = get_nearest_location_ids(coords)
+        except (ValueError, TypeError):
+            return jsonify(error="'coords' must be a list of [lat, lon] pairs"), 400
+
+    if not windows or location_ids is None:
+        return jsonify(error="'windows' and 'location_ids' are required"), 400
+    if not isinstance(windows, list) or not isinstance(location_ids, (list, np.ndarray)):
+        return jsonify(error="'windows' and 'location_ids' must be lists"), 400
+    if len(location_ids) != len(windows):
+        return jsonify(error="'windows' and 'location_ids' must have the same length"), 400
+
+    try:
+        forecasts = predict_next_24_hours_batch(windows, location_ids)
+    except (ValueError, TypeError) as e:
+        return jsonify(error=str(e)), 400
+
+    return jsonify(predictions=[[round(float(temp), 2) for temp in row] for row in forecasts])
+
+def build_comparison_table(predictions, lat, lon, start_dt, end_dt):
+    # Our forecast vs stored actuals (past windows) or third-party forecasts (future windows)
+    today = datetime.now().date()
+
+    avg_temp_our = round(np.mean(predictions), 2)
+    min_temp_our = round(np.min(predictions), 2)
+    max_temp_our = round(np.max(predictions), 2)
+
+    comparison_table = [
+        {"model": "Our Prediction", "avg_temp": avg_temp_our, "min_temp": min_temp_our, "max_temp": max_temp_our}
+    ]
+
+    if end_dt.date() < today:
+        hourly = fetch_hourly_range(get_location_key(lat, lon), start_dt, end_dt)
+        actual_temps = hourly[~np.isnan(hourly)]
+
+        if actual_temps.size:
+            avg_actual = round(np.mean(actual_temps), 2)
+            min_actual = round(np.min(actual_temps), 2)
+            max_actual = round(np.max(actual_temps), 2)
+
+            comparison_table += [
+                {"model": "Actual", "avg_temp": avg_actual, "min_temp": min_actual, "max_temp": max_actual},
+                {"model": "Error", "avg_temp": round(abs(avg_temp_our - avg_actual), 2),
+                 "min_temp": round(abs(min_temp_our - min_actual), 2),
+                 "max_temp": round(abs(max_temp_our - max_actual), 2)}
+            ]
+
+    else:
+        provider_temps = compare_providers(lat, lon, start_dt, end_dt)
+        for name, temps in provider_temps.items():
+            if temps:
+                comparison_table.append({"model": name, "avg_temp": round(np.mean(temps), 2),
+                                         "min_temp": round(np.min(temps), 2), "max_temp": round(np.max(temps), 2)})
+            else:
+                comparison_table.append({"model": name, "avg_temp": "N/A", "min_temp": "N/A", "max_temp": "N/A"})
+
+    return comparison_table
+
 @main.route('/further_analysis', methods=['POST'])
 def further_analysis():
     try:
+        forecast_id = request.form.get('forecast_id')
+        if forecast_id:
+            record = load_forecast(forecast_id)
+            if record is None:
+                return render_template("home.html", error="This forecast has expired, please run it again.", timestamp=datetime.now())
+
+            # a repeat visit within the store's lifetime reuses the table computed the first time
+            if "table" not in record:
+                record["table"] = build_comparison_table(
+                    record["predictions"], record["latitude"], record["longitude"],
+                    datetime.fromisoformat(record["start"]), datetime.fromisoformat(record["end"]))
+                update_forecast(forecast_id, record)
+
+            return render_template("further_analysis.html", table=record["table"])
+
+        # older pages post the full forecast back instead of an id
         predictions_str = request.form.get('predictions')
         if not predictions_str:
             return "No predictions provided", 400
@@ -180,105 +233,7 @@ def further_analysis():
             print("Date format error:", e)
             return render_template('home.html', error="Invalid date format.")
 
-        today = datetime.now().date()
-
-        avg_temp_our = round(np.mean(predictions), 2)
-        min_temp_our = round(np.min(predictions), 2)
-        max_temp_our = round(np.max(predictions), 2)
-
-        comparison_table = [
-            {"model": "Our Prediction", "avg_temp": avg_temp_our, "min_temp": min_temp_our, "max_temp": max_temp_our}
-        ]
-
-        def safe_get(api_url, label=""):
-            try:
-                resp = requests.get(api_url)
-                if resp.status_code != 200:
-                    print(f"[{label}] HTTP {resp.status_code}")
-                    return {}
-                return resp.json()
-            except Exception as e:
-                print(f"[{label}] Exception: {e}")
-                return {}
-
-        if end_dt.date() < today:
-            actual_temps = []
-            dt_pointer = start_dt
-            while dt_pointer <= end_dt:
-                record = db.session.query(Weather).filter_by(
-                    latitude=lat,
-                    longitude=lon,
-                    date=dt_pointer.date(),
-                    hour=dt_pointer.hour
-                ).first()
-                if record and record.temperature_2m is not None:
-                    actual_temps.append(record.temperature_2m)
-                dt_pointer += timedelta(hours=1)
-
-            if actual_temps:
-                avg_actual = round(np.mean(actual_temps), 2)
-                min_actual = round(np.min(actual_temps), 2)
-                max_actual = round(np.max(actual_temps), 2)
-
-                comparison_table += [
-                    {"model": "Actual", "avg_temp": avg_actual, "min_temp": min_actual, "max_temp": max_actual},
-                    {"model": "Error", "avg_temp": round(abs(avg_temp_our - avg_actual), 2),
-                     "min_temp": round(abs(min_temp_our - min_actual), 2),
-                     "max_temp": round(abs(max_temp_our - max_actual), 2)}
-                ]
-
-        else:
-            start_iso = start_dt.isoformat()
-            end_iso = end_dt.isoformat()
-
-            openmeteo_url = (
-                f"https://api.open-meteo.com/v1/forecast?"
-                f"latitude={lat}&longitude={lon}&hourly=temperature_2m"
-                f"&start={start_iso}&end={end_iso}&timezone=auto"
-            )
-            om_data = safe_get(openmeteo_url, "OpenMeteo")
-            om_hourly = om_data.get("hourly", {})
-            om_temps = om_hourly.get("temperature_2m", [])
-            if om_temps:
-                avg_temp_om = round(np.mean(om_temps), 2)
-                min_temp_om = round(np.min(om_temps), 2)
-                max_temp_om = round(np.max(om_temps), 2)
-            else:
-                avg_temp_om = min_temp_om = max_temp_om = "N/A"
-
-            # Weatherbit fallback using daily if hourly not available via free tier
-            weatherbit_url = (
-                f"https://api.weatherbit.io/v2.0/forecast/hourly?lat={lat}&lon={lon}&hours=48"
-                f"&key=17b72ff288764539a6242f985d8e226b"
-            )
-            wb_data = safe_get(weatherbit_url, "Weatherbit").get("data", [])
-            wb_range = [parser.parse(e["timestamp_local"]) for e in wb_data]
-            wb_temps = [e["temp"] for e in wb_data if start_dt <= parser.parse(e["timestamp_local"]) <= end_dt]
-            if wb_temps:
-                wb_avg = round(np.mean(wb_temps), 2)
-                wb_min = round(np.min(wb_temps), 2)
-                wb_max = round(np.max(wb_temps), 2)
-            else:
-                wb_avg = wb_min = wb_max = "N/A"
-
-            openweather_url = (
-                f"https://api.openweathermap.org/data/2.5/forecast?lat={lat}&lon={lon}&units=metric"
-                f"&appid=255366c723b840c4627d88efcfc97d21"
-            )
-            ow_data = safe_get(openweather_url, "OpenWeather").get("list", [])
-            ow_temps = [entry["main"]["temp"] for entry in ow_data if start_dt <= parser.parse(entry["dt_txt"]) <= end_dt]
-            if ow_temps:
-                ow_avg = round(np.mean(ow_temps), 2)
-                ow_min = round(np.min(ow_temps), 2)
-                ow_max = round(np.max(ow_temps), 2)
-            else:
-                ow_avg = ow_min = ow_max = "N/A"
-
-            comparison_table += [
-                {"model": "OpenMeteo", "avg_temp": avg_temp_om, "min_temp": min_temp_om, "max_temp": max_temp_om},
-                {"model": "Weatherbit", "avg_temp": wb_avg, "min_temp": wb_min, "max_temp": wb_max},
-                {"model": "OpenWeather", "avg_temp": ow_avg, "min_temp": ow_min, "max_temp": ow_max},
-            ]
+        comparison_table = build_comparison_table(predictions, lat, lon, start_dt, end_dt)
 
         return render_template("further_analysis.html", table=comparison_table)
 
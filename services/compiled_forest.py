@@ -0,0 +1,122 @@
+#compiled_forest.py
+# Flattens fitted sklearn forests into contiguous NumPy node arrays and evaluates them
+# with plain NumPy, so the serving process never has to import sklearn.
+
+import json
+import os
+import numpy as np
+
+_ARRAYS = ("feature", "threshold", "left", "right", "value", "roots", "output_cols")
+
+
+class CompiledForest:
+    def __init__(self, feature, threshold, left, right, value, roots, output_cols, n_outputs, depth, n_features):
+        self.feature = feature          # (n_nodes,) split feature, 0 for leaves
+        self.threshold = threshold      # (n_nodes,) split threshold
+        self.left = left                # (n_nodes,) global index of left child, leaves point at themselves
+        self.right = right              # (n_nodes,) global index of right child, leaves point at themselves
+        self.value = value              # (n_nodes, width) leaf values
+        self.roots = roots              # (n_trees,) global index of each tree's root
+        self.output_cols = output_cols  # (n_trees,) first output column each tree writes to
+        self.n_outputs = n_outputs
+        self.depth = depth
+        self.n_features = n_features
+
+        # Averaging matrix: tree t's value columns -> the outputs it contributes to,
+        # divided by the number of trees voting for that output
+        width = value.shape[1]
+        weights = np.zeros((len(roots) * width, n_outputs))
+        for t, col in enumerate(output_cols):
+            for w in range(width):
+                weights[t * width + w, col + w] = 1.0
+        weights /= weights.sum(axis=0, keepdims=True)
+        self._weights = weights
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+
+        # Walk every (row, tree) pair down at once; leaves loop onto themselves,
+        # so a fixed number of steps equal to the deepest tree is enough
+        rows = np.arange(len(X))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(X), len(self.roots))).copy()
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        leaf_values = self.value[nodes].reshape(len(X), -1)
+        out = leaf_values @ self._weights
+        return out[:, 0] if self.n_outputs == 1 else out
+
+
+def _forests(model):
+    # MultiOutputRegressor -> one forest per output; a plain forest -> itself
+    if hasattr(model, "estimators_") and all(hasattr(e, "estimators_") for e in model.estimators_):
+        return list(model.estimators_)
+    return [model]
+
+
+def compile_forest(model):
+    feature, threshold, left, right, value = [], [], [], [], []
+    roots, output_cols = [], []
+    offset = 0
+    depth = 0
+    output_col = 0
+    width = None
+
+    for forest in _forests(model):
+        forest_width = forest.estimators_[0].tree_.value.shape[1]
+        if width is None:
+            width = forest_width
+        elif width != forest_width:
+            raise ValueError("All forests must predict the same number of outputs per tree.")
+
+        for est in forest.estimators_:
+            tree = est.tree_
+            is_leaf = tree.children_left == -1
+            own = np.arange(tree.node_count) + offset
+
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(np.where(is_leaf, 0.0, tree.threshold))
+            left.append(np.where(is_leaf, own, tree.children_left + offset))
+            right.append(np.where(is_leaf, own, tree.children_right + offset))
+            value.append(tree.value[:, :, 0])
+            roots.append(offset)
+            output_cols.append(output_col)
+
+            depth = max(depth, tree.max_depth)
+            offset += tree.node_count
+        output_col += forest_width
+
+    return CompiledForest(
+        feature=np.concatenate(feature).astype(np.intp),
+        threshold=np.concatenate(threshold).astype(np.float64),
+        left=np.concatenate(left).astype(np.intp),
+        right=np.concatenate(right).astype(np.intp),
+        value=np.concatenate(value).astype(np.float64),
+        roots=np.asarray(roots, dtype=np.intp),
+        output_cols=np.asarray(output_cols, dtype=np.intp),
+        n_outputs=output_col,
+        depth=depth,
+        n_features=int(model.n_features_in_),
+    )
+
+
+def save_compiled(forest, directory):
+    # One .npy per array plus a small JSON header
+    os.makedirs(directory, exist_ok=True)
+    for name in _ARRAYS:
+        np.save(os.path.join(directory, f"{name}.npy"), getattr(forest, name))
+    meta = {"n_outputs": forest.n_outputs, "depth": forest.depth, "n_features": forest.n_features}
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+
+def load_compiled(directory, mmap_mode=None):
+    # mmap_mode="r" maps the node arrays read-only from the page cache, so every
+    # worker forked from a preloading master shares one physical copy
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in _ARRAYS}
+    return CompiledForest(**arrays, **meta)
@@ -0,0 +1,183 @@
+#forecast_cache.py
+# Forecast results keyed by (location cell, issue hour, model version). The input window
+# only changes once an hour, so repeat requests within the hour skip the history fetch
+# and the model entirely. In-process LRU, with an optional SQLite tier shared by workers.
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+from dbmodles.location import get_location_key
+from services.load_predict2 import model_version, predict_next_24_hours
+from services.singleflight import coalesce
+from services.weather_api import fetch_temperature_data
+
+_lru = OrderedDict()
+_lock = threading.Lock()
+_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+_current_version = None
+_schema_checked = False
+
+
+def issue_hour(issue_time):
+    return issue_time.replace(minute=0, second=0, microsecond=0)
+
+
+def _db():
+    global _schema_checked
+    conn = sqlite3.connect(Config.FORECAST_CACHE_PATH, timeout=5)
+    if not _schema_checked:
+        # Tables from before eviction have no created_at; it's only a cache, so start over
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(forecast_cache)")]
+        if columns and "created_at" not in columns:
+            with conn:
+                conn.execute("DROP TABLE forecast_cache")
+        _schema_checked = True
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS forecast_cache ("
+        " location_key INTEGER, issue_hour TEXT, model_version TEXT, payload TEXT NOT NULL,"
+        " created_at REAL NOT NULL,"
+        " PRIMARY KEY (location_key, issue_hour, model_version))"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_forecast_cache_created ON forecast_cache (created_at)")
+    return conn
+
+
+def _check_version(version):
+    # A newly loaded model makes every older entry unreachable; drop them from memory and disk
+    global _current_version
+    if version == _current_version:
+        return
+    _current_version = version
+    for key in [key for key in _lru if key[2] != version]:
+        del _lru[key]
+    if Config.FORECAST_CACHE_PATH:
+        conn = _db()
+        try:
+            with conn:
+                conn.execute("DELETE FROM forecast_cache WHERE model_version != ?", (version,))
+        finally:
+            conn.close()
+
+
+def _get(key):
+    payload = _lru.get(key)
+    if payload is not None:
+        _lru.move_to_end(key)
+        _stats["memory_hits"] += 1
+        return payload
+
+    if Config.FORECAST_CACHE_PATH:
+        conn = _db()
+        try:
+            row = conn.execute(
+                "SELECT payload FROM forecast_cache WHERE location_key = ? AND issue_hour = ? AND model_version = ?"
+                " AND created_at >= ?",
+                (*key, time.time() - Config.FORECAST_RESULT_TTL),
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is not None:
+            payload = json.loads(row[0])
+            _put_memory(key, payload)
+            _stats["disk_hits"] += 1
+            return payload
+    return None
+
+
+def _put_memory(key, payload):
+    _lru[key] = payload
+    _lru.move_to_end(key)
+    while len(_lru) > Config.FORECAST_CACHE_SIZE:
+        _lru.popitem(last=False)
+
+
+def _put(key, payload):
+    _put_memory(key, payload)
+    if Config.FORECAST_CACHE_PATH:
+        conn = _db()
+        try:
+            now = time.time()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO forecast_cache (location_key, issue_hour, model_version, payload, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (*key, json.dumps(payload), now),
+                )
+                # Evict by age, then trim to the newest FORECAST_CACHE_DISK_ROWS
+                conn.execute("DELETE FROM forecast_cache WHERE created_at < ?", (now - Config.FORECAST_RESULT_TTL,))
+                conn.execute(
+                    "DELETE FROM forecast_cache WHERE rowid IN ("
+                    " SELECT rowid FROM forecast_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                    (Config.FORECAST_CACHE_DISK_ROWS,),
+                )
+        finally:
+            conn.close()
+
+
+def _lookup(key, version):
+    with _lock:
+        _check_version(version)
+        return _get(key)
+
+
+def _store(key, payload):
+    with _lock:
+        _put(key, payload)
+
+
+def get_forecast(lat, lon, issue_time, location_id):
+    """24-hour forecast issued at issue_time's hour for (lat, lon).
+
+    Returns {"predictions": [...], "last_time": iso str of the last input hour, i.e. the
+    issue hour} or None
+    when there isn't enough history to forecast from.
+    """
+    version = model_version()
+    key = (get_location_key(lat, lon), issue_hour(issue_time).isoformat(timespec="minutes"), version)
+
+    payload = _lookup(key, version)
+    if payload is not None:
+        return payload
+
+    def compute():
+        _stats["misses"] += 1
+        start_date, end_date, past_24_temps, times = fetch_temperature_data(lat, lon, issue_time.date(), end_time=issue_time)
+        if not past_24_temps or len(past_24_temps) < 24:
+            return None
+
+        payload = {
+            "predictions": predict_next_24_hours(past_24_temps, location_id),
+            # the window ends at the issue hour; times[-1] would be the end of the fetched day
+            "last_time": key[1],
+        }
+        _store(key, payload)
+        return payload
+
+    # identical concurrent requests wait for one fetch + inference; after the lock, the
+    # cache is re-read in case another worker produced the forecast in the meantime
+    return coalesce(_flight_key(key), compute, check=lambda: _lookup(key, version))
+
+
+def _flight_key(key):
+    return "forecast:{}:{}:{}".format(*key)
+
+
+def put_forecast(location_key, issue_time, payload):
+    # For forecasts computed outside get_forecast, e.g. the hourly precompute job
+    version = model_version()
+    key = (location_key, issue_hour(issue_time).isoformat(timespec="minutes"), version)
+    with _lock:
+        _check_version(version)
+        _put(key, payload)
+
+
+def cache_stats():
+    stats = dict(_stats)
+    lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+    stats["hit_ratio"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+    stats["size"] = len(_lru)
+    return stats
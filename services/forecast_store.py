@@ -0,0 +1,95 @@
+#forecast_store.py
+# Short-lived server-side copies of the forecasts shown on predictions.html. The page
+# posts back only the forecast id, and /further_analysis picks up the prediction array,
+# coordinates and time window from here instead of re-sending and re-parsing them.
+# Bounded in-process store with expiry, with an optional SQLite tier so the id also
+# resolves on another worker.
+
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from config import Config
+
+_store = OrderedDict()
+_lock = threading.Lock()
+
+
+def _db():
+    conn = sqlite3.connect(Config.FORECAST_STORE_PATH, timeout=5)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS forecast_store ("
+        " forecast_id TEXT PRIMARY KEY, record TEXT NOT NULL, expires_at REAL NOT NULL)"
+    )
+    return conn
+
+
+def _put_memory(forecast_id, record, expires_at):
+    _store[forecast_id] = (record, expires_at)
+    _store.move_to_end(forecast_id)
+    while len(_store) > Config.FORECAST_STORE_SIZE:
+        _store.popitem(last=False)
+
+
+def _write(forecast_id, record, expires_at):
+    if Config.FORECAST_STORE_PATH:
+        conn = _db()
+        try:
+            with conn:
+                conn.execute("DELETE FROM forecast_store WHERE expires_at < ?", (time.time(),))
+                conn.execute(
+                    "INSERT OR REPLACE INTO forecast_store (forecast_id, record, expires_at) VALUES (?, ?, ?)",
+                    (forecast_id, json.dumps(record), expires_at),
+                )
+        finally:
+            conn.close()
+
+
+def save_forecast(record):
+    """Store a JSON-serialisable forecast record and return its id."""
+    forecast_id = secrets.token_urlsafe(9)
+    expires_at = time.time() + Config.FORECAST_STORE_TTL
+    with _lock:
+        _put_memory(forecast_id, record, expires_at)
+    _write(forecast_id, record, expires_at)
+    return forecast_id
+
+
+def update_forecast(forecast_id, record):
+    # Attach derived results (e.g. the comparison table) without extending the expiry
+    with _lock:
+        entry = _store.get(forecast_id)
+        expires_at = entry[1] if entry else time.time() + Config.FORECAST_STORE_TTL
+        _put_memory(forecast_id, record, expires_at)
+    _write(forecast_id, record, expires_at)
+
+
+def load_forecast(forecast_id):
+    """The stored record, or None if the id is unknown or has expired."""
+    now = time.time()
+    with _lock:
+        entry = _store.get(forecast_id)
+        if entry is not None:
+            if entry[1] > now:
+                _store.move_to_end(forecast_id)
+                return entry[0]
+            del _store[forecast_id]
+
+    if Config.FORECAST_STORE_PATH:
+        conn = _db()
+        try:
+            row = conn.execute(
+                "SELECT record, expires_at FROM forecast_store WHERE forecast_id = ? AND expires_at > ?",
+                (forecast_id, now),
+            ).fetchone()
+        finally:
+            conn.close()
+        if row is not None:
+            record = json.loads(row[0])
+            with _lock:
+                _put_memory(forecast_id, record, row[1])
+            return record
+    return None
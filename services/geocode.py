@@ -1,8 +1,119 @@
+from collections import OrderedDict
+import sqlite3
+import threading
+import time
+
 from geopy.geocoders import Nominatim
 
+from config import Config
+from services.singleflight import coalesce
+
+_geolocator = None
+_lru = OrderedDict()
+_lock = threading.Lock()
+_stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "negative_hits": 0}
+
+
+def _normalize(location_name):
+    # "  Pune ,  India" and "pune, india" are the same query
+    parts = (" ".join(part.split()) for part in location_name.lower().split(","))
+    return ", ".join(part for part in parts if part)
+
+
+def _get_geolocator():
+    global _geolocator
+    if _geolocator is None:
+        _geolocator = Nominatim(user_agent="geoapi")
+    return _geolocator
+
+
+def _db():
+    conn = sqlite3.connect(Config.GEOCODE_CACHE_PATH, timeout=5)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS geocode_cache ("
+        " query TEXT PRIMARY KEY, latitude REAL, longitude REAL, expires_at REAL NOT NULL)"
+    )
+    return conn
+
+
+def _remember(query, coords, expires_at):
+    _lru[query] = (coords, expires_at)
+    _lru.move_to_end(query)
+    while len(_lru) > Config.GEOCODE_CACHE_SIZE:
+        _lru.popitem(last=False)
+
+
+def _lookup_cached(query):
+    now = time.time()
+    entry = _lru.get(query)
+    if entry is not None:
+        if entry[1] > now:
+            _lru.move_to_end(query)
+            _stats["memory_hits"] += 1
+            return entry[0]
+        del _lru[query]
+
+    conn = _db()
+    try:
+        row = conn.execute(
+            "SELECT latitude, longitude, expires_at FROM geocode_cache WHERE query = ?", (query,)
+        ).fetchone()
+    finally:
+        conn.close()
+    if row is not None and row[2] > now:
+        coords = (row[0], row[1])
+        _remember(query, coords, row[2])
+        _stats["disk_hits"] += 1
+        return coords
+    return None
+
+
+def _store(query, coords):
+    # Unknown places are cached too (as NULLs), for a shorter time
+    ttl = Config.GEOCODE_TTL if coords[0] is not None else Config.GEOCODE_NEGATIVE_TTL
+    expires_at = time.time() + ttl
+    _remember(query, coords, expires_at)
+    conn = _db()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache (query, latitude, longitude, expires_at) VALUES (?, ?, ?, ?)",
+                (query, coords[0], coords[1], expires_at),
+            )
+    finally:
+        conn.close()
+
+
 def get_coordinates(location_name):
-    geolocator = Nominatim(user_agent="geoapi")
-    location = geolocator.geocode(location_name)
-    if location:
-        return location.latitude, location.longitude
-    return None, None
+    query = _normalize(location_name)
+
+    with _lock:
+        cached = _lookup_cached(query)
+    if cached is not None:
+        if cached[0] is None:
+            _stats["negative_hits"] += 1
+        return cached
+
+    def lookup():
+        _stats["misses"] += 1
+        location = _get_geolocator().geocode(query)
+        coords = (location.latitude, location.longitude) if location else (None, None)
+        with _lock:
+            _store(query, coords)
+        return coords
+
+    def recheck():
+        # another worker may have stored it while we waited for the lock
+        with _lock:
+            return _lookup_cached(query)
+
+    # concurrent requests for the same place share one Nominatim call
+    return coalesce(f"geocode:{query}", lookup, check=recheck)
+
+
+def cache_stats():
+    stats = dict(_stats)
+    lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+    stats["hit_ratio"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+    stats["size"] = len(_lru)
+    return stats
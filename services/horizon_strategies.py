@@ -0,0 +1,109 @@
+#horizon_strategies.py
+# Multi-horizon forecasting strategies behind one predict(window, location_id, horizon) API.
+# Windows are always chronological (oldest hour first), as the routes pass them.
+#   direct    - the 24-output model (ml/load_predict), one evaluation for all horizons
+#   recursive - the single-step model (services/load_predict2), one evaluation per hour
+#   hybrid    - recursive, but every k-th hour is taken from the direct model, which
+#               re-anchors the rolled window and skips that step's evaluation
+
+import numpy as np
+
+from services.compiled_forest import CompiledForest
+from services.load_predict2 import HORIZON, N_LAGS, _predict_rows, recursive_forecast
+
+
+def _predict_outputs(model, rows):
+    # (N, n_outputs) from a compiled forest or a fitted MultiOutputRegressor of forests
+    if isinstance(model, CompiledForest):
+        return model.predict(rows).reshape(len(rows), -1)
+    return np.column_stack([_predict_rows(forest, rows) for forest in model.estimators_])
+
+
+def _as_windows(windows, location_ids):
+    windows = np.asarray(windows, dtype=np.float64)
+    if windows.ndim != 2 or windows.shape[1] != N_LAGS:
+        raise ValueError("windows must have shape (N, 24).")
+    location_ids = np.broadcast_to(np.asarray(location_ids, dtype=np.float64), (len(windows),))
+    return windows, location_ids
+
+
+class HorizonStrategy:
+    name = ""
+
+    def predict_batch(self, windows, location_ids, horizon=HORIZON):
+        raise NotImplementedError
+
+    def predict(self, window, location_id=0, horizon=HORIZON):
+        forecast = self.predict_batch([window], [location_id], horizon)[0]
+        return [round(float(temp), 2) for temp in forecast]
+
+
+class DirectStrategy(HorizonStrategy):
+    name = "direct"
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict_batch(self, windows, location_ids, horizon=HORIZON):
+        windows, _ = _as_windows(windows, location_ids)
+        if horizon > HORIZON:
+            raise ValueError(f"The direct model only covers {HORIZON} hours.")
+        # trained on temp_t-1 ... temp_t-24, i.e. newest hour first. Note ml/preprocess.py
+        # builds target_t+k from shift(-k) while the lags start at shift(1), so output k is
+        # really the hour k+1 after the window; it is served (and benchmarked) as hour k,
+        # exactly as ml/load_predict does.
+        rows = np.ascontiguousarray(windows[:, ::-1], dtype=np.float32)
+        return _predict_outputs(self.model, rows)[:, :horizon]
+
+
+class RecursiveStrategy(HorizonStrategy):
+    name = "recursive"
+
+    def __init__(self, model):
+        self.model = model
+
+    def predict_batch(self, windows, location_ids, horizon=HORIZON):
+        windows, location_ids = _as_windows(windows, location_ids)
+        return recursive_forecast(self.model, windows, location_ids, horizon)
+
+
+class HybridStrategy(HorizonStrategy):
+    name = "hybrid"
+
+    def __init__(self, direct_model, recursive_model, k=6):
+        self.direct = DirectStrategy(direct_model)
+        self.recursive_model = recursive_model
+        self.k = k
+
+    def predict_batch(self, windows, location_ids, horizon=HORIZON):
+        windows, location_ids = _as_windows(windows, location_ids)
+        direct = self.direct.predict_batch(windows, location_ids, min(horizon, HORIZON))
+        # recursive step s is hour s+1 after the window, which is direct output s-1 (see
+        # DirectStrategy), so anchoring with direct[:, s] would put every anchor an hour late
+        anchors = {step: direct[:, step - 1]
+                   for step in range(max(self.k - 1, 1), min(horizon, direct.shape[1] + 1), self.k)}
+        return recursive_forecast(self.recursive_model, windows, location_ids, horizon, anchors=anchors)
+
+
+def build_strategies(direct_model, recursive_model, k=6):
+    return {
+        "direct": DirectStrategy(direct_model),
+        "recursive": RecursiveStrategy(recursive_model),
+        "hybrid": HybridStrategy(direct_model, recursive_model, k),
+    }
+
+
+_strategies = None
+
+
+def get_strategy(name):
+    global _strategies
+    if _strategies is None:
+        from ml.load_predict import load_model as load_direct_model
+        from services.load_predict2 import load_model as load_recursive_model
+        _strategies = build_strategies(load_direct_model(), load_recursive_model())
+    return _strategies[name]
+
+
+def predict(window, location_id=0, horizon=HORIZON, strategy="recursive"):
+    return get_strategy(strategy).predict(window, location_id, horizon)
@@ -0,0 +1,124 @@
+#http_client.py
+# Shared HTTP client: one keep-alive connection pool, bounded retries with backoff,
+# per-endpoint timeouts and an on-disk expiring response cache.
+
+import json
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import Config
+
+# (connect, read) timeouts in seconds, by host; anything else gets DEFAULT_TIMEOUT
+ENDPOINT_TIMEOUTS = {
+    "archive-api.open-meteo.com": (3.05, 20),
+    "api.open-meteo.com": (3.05, 10),
+}
+DEFAULT_TIMEOUT = (3.05, 10)
+
+_sessions = {}
+_session_lock = threading.Lock()
+_cache_lock = threading.Lock()
+
+
+def get_session(retries=True):
+    # Callers with their own deadline (the providers) use the session without retries,
+    # so a hung host can't hold a thread for several timeouts after they've given up
+    session = _sessions.get(retries)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(retries)
+            if session is None:
+                retry = Retry(
+                    total=3,
+                    backoff_factor=0.3,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=("GET",),
+                ) if retries else 0
+                adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _sessions[retries] = session
+    return session
+
+
+def _timeout_for(url):
+    return ENDPOINT_TIMEOUTS.get(urlsplit(url).hostname, DEFAULT_TIMEOUT)
+
+
+def _cache_conn():
+    conn = sqlite3.connect(Config.HTTP_CACHE_PATH, timeout=5)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS http_cache ("
+        " key TEXT PRIMARY KEY, expires_at REAL NOT NULL, body TEXT NOT NULL)"
+    )
+    return conn
+
+
+def _cache_key(url, params):
+    return url + "?" + json.dumps(params or {}, sort_keys=True, default=str)
+
+
+def _cache_get(key):
+    with _cache_lock:
+        conn = _cache_conn()
+        try:
+            row = conn.execute("SELECT expires_at, body FROM http_cache WHERE key = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+    if row is None or row[0] < time.time():
+        return None
+    return json.loads(row[1])
+
+
+def _cache_put(key, data, ttl):
+    with _cache_lock:
+        conn = _cache_conn()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO http_cache (key, expires_at, body) VALUES (?, ?, ?)",
+                    (key, time.time() + ttl, json.dumps(data)),
+                )
+                conn.execute("DELETE FROM http_cache WHERE expires_at < ?", (time.time(),))
+        finally:
+            conn.close()
+
+
+def get_json(url, params=None, ttl=0, timeout=None, verify=None, retries=True):
+    """GET url and return (status_code, json_or_None).
+
+    Successful responses are cached on disk for ttl seconds (0 disables caching).
+    verify defaults to Config.HTTP_VERIFY_TLS; retries=False makes a single attempt.
+    """
+    key = _cache_key(url, params)
+    if ttl > 0:
+        cached = _cache_get(key)
+        if cached is not None:
+            return 200, cached
+
+    try:
+        response = get_session(retries).get(url, params=params, timeout=timeout or _timeout_for(url),
+                                     verify=Config.HTTP_VERIFY_TLS if verify is None else verify)
+    except requests.RequestException as e:
+        print(f"HTTP request to {url} failed:", e)
+        return None, None
+
+    if response.status_code != 200:
+        print("API call failed:", response.status_code, response.text)
+        return response.status_code, None
+
+    try:
+        data = response.json()
+    except ValueError:
+        return response.status_code, None
+
+    if ttl > 0:
+        _cache_put(key, data, ttl)
+    return response.status_code, data
@@ -1,40 +1,110 @@
 #load_predict2.py
+import hashlib
 import numpy as np
 import joblib
-import pandas as pd
-import sys
+import os
+
+from services.compiled_forest import CompiledForest, load_compiled
+from services.memory_report import memory_report
 
 _model = None
+_model_version = None
+
+N_LAGS = 24
+HORIZON = 24
+
+# Serving artifact. The compiled export from ml/compile_model.py is the default: it is
+# evaluated without sklearn and its arrays are memory-mapped, so gunicorn's preloaded
+# master shares the pages with every worker. MODEL_PATH may point at either format.
+# (Read from the environment here rather than Config, since ml/ scripts import this
+# module with ml/config.py first on the path.)
+MODEL_PATH = os.environ.get("MODEL_PATH", "/home/aditya/flask/ml/models/lightweight_singlefeatures_temp_model_compiled")
+JOBLIB_MODEL_PATH = "/home/aditya/flask/ml/models/lightweight_singlefeatures_temp_model.joblib"
 
-def load_model(model_path="/home/aditya/flask/ml/models/lightweight_singlefeatures_temp_model.joblib"):
-    global _model
+def _artifact_version(model_path):
+    # Cheap content fingerprint: path, size and mtime of the artifact (every file for a compiled dir)
+    paths = [model_path]
+    if os.path.isdir(model_path):
+        paths = sorted(os.path.join(model_path, name) for name in os.listdir(model_path))
+    digest = hashlib.sha1()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:12]
+
+def load_model(model_path=None, mmap_mode="r"):
+    global _model, _model_version
     if _model is None:
-        print("Loading model")
-        _model = joblib.load(model_path)
-        print("Model loaded")
-        print("Estimated size in RAM:", sys.getsizeof(_model))
+        if model_path is None:
+            model_path = MODEL_PATH
+            if not os.path.exists(model_path) and os.path.exists(JOBLIB_MODEL_PATH):
+                # not exported yet: still serve, but the sklearn trees are private per process
+                print(f"[INFO] {model_path} not found, run ml/compile_model.py; using {JOBLIB_MODEL_PATH}")
+                model_path = JOBLIB_MODEL_PATH
+        print("Loading model", model_path)
+        if os.path.isdir(model_path):
+            # Flat array export from ml/compile_model.py, no sklearn needed
+            _model = load_compiled(model_path, mmap_mode=mmap_mode)
+        else:
+            # sklearn's Tree copies its node arrays on unpickling, so a joblib forest is
+            # always a private copy per process; mmap_mode only applies to the compiled export
+            _model = joblib.load(model_path)
+        _model_version = _artifact_version(model_path)
+        print("Model loaded, version", _model_version)
+        print("Estimated size in RAM:", memory_report(_model))
     return _model
 
-def predict_next_24_hours(past_24_temps, location_id=0):
-    if len(past_24_temps) != 24:
-        raise ValueError("Exactly 24 hourly temperature values are required.")
+def model_version():
+    load_model()
+    return _model_version
 
-    model = load_model()
+def _predict_rows(model, rows):
+    if isinstance(model, CompiledForest):
+        return model.predict(rows)
 
-    # Feature names used during training
-    feature_names = [f"temp_t-{i}" for i in range(1, 25)] + ["location_id"]
-    current_input = past_24_temps[:]  # Make a copy of the input list
+    # Average the forest's trees directly on float32 rows (what sklearn casts to anyway),
+    # skipping the per-call input validation and thread-pool dispatch of model.predict
+    estimators = getattr(model, "estimators_", None)
+    if estimators is None:
+        return np.asarray(model.predict(rows), dtype=np.float64).reshape(len(rows))
 
-    predictions = []
+    total = np.zeros(len(rows), dtype=np.float64)
+    for tree in estimators:
+        total += tree.tree_.predict(rows)[:, 0]
+    return total / len(estimators)
 
-    for _ in range(24):
-        input_data = current_input + [location_id]  # Add location_id at end
-        input_df = pd.DataFrame([input_data], columns=feature_names)
+def recursive_forecast(model, windows, location_ids, horizon=HORIZON, anchors=None):
+    # Rolling windows live in one preallocated buffer: the first 24 columns hold the
+    # observed temps and every prediction is written right after them, so the input
+    # for step k is simply history[:, k:k + 24] followed by location_id.
+    # All N series advance together, one forest evaluation per horizon step.
+    # anchors, if given, maps a step index to an (N,) array used instead of evaluating the model.
+    history = np.empty((len(windows), N_LAGS + horizon), dtype=np.float64)
+    history[:, :N_LAGS] = windows
 
-        next_temp = model.predict(input_df)[0]
-        predictions.append(next_temp)
+    rows = np.empty((len(windows), N_LAGS + 1), dtype=np.float32)
+    rows[:, N_LAGS] = location_ids
 
-        # Update input for next prediction
-        current_input = current_input[1:] + [next_temp]
+    for step in range(horizon):
+        if anchors is not None and step in anchors:
+            history[:, N_LAGS + step] = anchors[step]
+            continue
+        rows[:, :N_LAGS] = history[:, step:step + N_LAGS]
+        history[:, N_LAGS + step] = _predict_rows(model, rows)
+
+    return history[:, N_LAGS:]
+
+def predict_next_24_hours_batch(past_windows, location_ids):
+    windows = np.asarray(past_windows, dtype=np.float64)
+    if windows.ndim != 2 or windows.shape[1] != N_LAGS:
+        raise ValueError("past_windows must have shape (N, 24).")
+    location_ids = np.broadcast_to(np.asarray(location_ids, dtype=np.float64), (len(windows),))
+
+    return recursive_forecast(load_model(), windows, location_ids)
+
+def predict_next_24_hours(past_24_temps, location_id=0):
+    if len(past_24_temps) != N_LAGS:
+        raise ValueError("Exactly 24 hourly temperature values are required.")
 
-    return [round(temp, 2) for temp in predictions]
+    predictions = predict_next_24_hours_batch([past_24_temps], [location_id])[0]
+    return [round(float(temp), 2) for temp in predictions]
@@ -0,0 +1,39 @@
+#locations.py
+
+from services.spatial_index import LocationIndex
+
+# ✅ Known training locations (location_id used by the model -> coordinates)
+known_locations = {
+    0: (18.5204, 73.8567),  # Pune 1
+    1: (18.5036, 73.8077),  # Pune 2
+    2: (18.1850, 75.7394),  # Satara 1
+    3: (17.6599, 75.9064),  # Satara 2
+    4: (17.2892, 74.1811),  # Kolhapur 1
+    5: (16.9902, 74.2295),  # Kolhapur 2
+}
+
+_index = None
+
+def get_location_index():
+    # Built once on first use; rebuild with reset_location_index() after registering more
+    global _index
+    if _index is None:
+        _index = LocationIndex(known_locations)
+    return _index
+
+def reset_location_index():
+    global _index
+    _index = None
+
+# ✅ Helper to get nearest location ID
+def get_nearest_location_id(lat, lon, max_distance_km=None):
+    """Nearest known location by haversine distance, or None if it is further than max_distance_km."""
+    ids, distances = get_location_index().nearest(lat, lon)
+    if max_distance_km is not None and distances[0] > max_distance_km:
+        return None
+    return int(ids[0])
+
+def get_nearest_location_ids(coords):
+    # Batch version for the bulk forecast path: (ids, distances_km) for a list of (lat, lon)
+    ids, distances = get_location_index().nearest_batch(coords)
+    return ids[:, 0], distances[:, 0]
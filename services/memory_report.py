@@ -0,0 +1,58 @@
+#memory_report.py
+# Deep memory size of a loaded model. sys.getsizeof only counts the outer object,
+# so a fitted forest reports a few dozen bytes.
+
+import gc
+import mmap
+import sys
+import types
+import numpy as np
+
+
+def _is_mapped(arr):
+    # Follow the base chain to see whether the buffer is a file mapping (shared
+    # between worker processes) or private heap memory
+    base = arr
+    while isinstance(base, np.ndarray) and base.base is not None:
+        base = base.base
+    return isinstance(base, mmap.mmap)
+
+
+def deep_sizeof(obj):
+    """Return (private_bytes, mapped_bytes) reachable from obj."""
+    seen = set()
+    private = 0
+    mapped = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, (type, types.ModuleType)):
+            continue
+        seen.add(id(current))
+
+        if isinstance(current, np.ndarray):
+            # getsizeof includes the data buffer only when the array owns it;
+            # views are charged to their owner through the base chain
+            private += sys.getsizeof(current)
+            if _is_mapped(current):
+                mapped += current.nbytes
+            elif current.base is not None:
+                stack.append(current.base)
+            if current.dtype == object:
+                stack.extend(current.ravel().tolist())
+            continue
+
+        if type(current).__name__ == "Tree" and hasattr(current, "__getstate__"):
+            # sklearn's Cython Tree keeps its node and value buffers outside Python objects
+            state = current.__getstate__()
+            private += state["nodes"].nbytes + state["values"].nbytes
+            continue
+
+        private += sys.getsizeof(current)
+        stack.extend(gc.get_referents(current))
+    return private, mapped
+
+
+def memory_report(obj):
+    private, mapped = deep_sizeof(obj)
+    return f"{private / (1024 * 1024):.2f} MB private, {mapped / (1024 * 1024):.2f} MB memory-mapped"
@@ -0,0 +1,118 @@
+#providers.py
+# Third-party forecasts for the further_analysis comparison table. All providers are
+# queried concurrently; whatever hasn't answered by the deadline is reported as missing.
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from dateutil import parser
+
+from config import Config
+from services.http_client import get_json
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="provider")
+
+
+class Provider:
+    name = ""
+    # a single attempt (no retries), with connect + read inside Config.PROVIDER_DEADLINE,
+    # so a hung provider frees its _executor thread about when the wait gives up on it
+    timeout = (1.5, 2.5)
+    deadline = None  # seconds to wait for this provider; Config.PROVIDER_DEADLINE if None
+
+    def request(self, lat, lon, start_dt, end_dt):
+        """Return (url, params) for the forecast covering start_dt..end_dt."""
+        raise NotImplementedError
+
+    def parse(self, data, start_dt, end_dt):
+        """Return the hourly temperatures inside start_dt..end_dt."""
+        raise NotImplementedError
+
+    def fetch(self, lat, lon, start_dt, end_dt):
+        url, params = self.request(lat, lon, start_dt, end_dt)
+        # API keys travel in the query string, so certificates are always checked here
+        status, data = get_json(url, params=params, ttl=Config.FORECAST_CACHE_TTL, timeout=self.timeout,
+                                verify=True, retries=False)
+        if status != 200 or data is None:
+            print(f"[{self.name}] HTTP {status}")
+            return []
+        return self.parse(data, start_dt, end_dt)
+
+
+class OpenMeteoProvider(Provider):
+    name = "OpenMeteo"
+
+    def request(self, lat, lon, start_dt, end_dt):
+        params = {
+            "latitude": lat,
+            "longitude": lon,
+            "hourly": "temperature_2m",
+            "start_hour": start_dt.strftime("%Y-%m-%dT%H:00"),
+            "end_hour": end_dt.strftime("%Y-%m-%dT%H:00"),
+            "timezone": "auto",
+        }
+        return Config.OPEN_METEO_FORECAST_URL, params
+
+    def parse(self, data, start_dt, end_dt):
+        return [t for t in data.get("hourly", {}).get("temperature_2m", []) if t is not None]
+
+
+class WeatherbitProvider(Provider):
+    name = "Weatherbit"
+
+    def request(self, lat, lon, start_dt, end_dt):
+        params = {"lat": lat, "lon": lon, "hours": 48, "key": Config.WEATHERBIT_API_KEY}
+        return Config.WEATHERBIT_URL, params
+
+    def parse(self, data, start_dt, end_dt):
+        return [e["temp"] for e in data.get("data", [])
+                if start_dt <= parser.parse(e["timestamp_local"]) <= end_dt]
+
+
+class OpenWeatherProvider(Provider):
+    name = "OpenWeather"
+
+    def request(self, lat, lon, start_dt, end_dt):
+        params = {"lat": lat, "lon": lon, "units": "metric", "appid": Config.OPENWEATHER_API_KEY}
+        return Config.OPENWEATHER_URL, params
+
+    def parse(self, data, start_dt, end_dt):
+        return [e["main"]["temp"] for e in data.get("list", [])
+                if start_dt <= parser.parse(e["dt_txt"]) <= end_dt]
+
+
+DEFAULT_PROVIDERS = [OpenMeteoProvider(), WeatherbitProvider(), OpenWeatherProvider()]
+
+
+def _safe_fetch(provider, lat, lon, start_dt, end_dt):
+    try:
+        return provider.fetch(lat, lon, start_dt, end_dt)
+    except Exception as e:
+        print(f"[{provider.name}] Exception: {e}")
+        return []
+
+
+def compare_providers(lat, lon, start_dt, end_dt, providers=None, deadline=None):
+    """Query every provider at once; returns {name: temps, or None if it missed its deadline}.
+
+    deadline, when given, overrides each provider's own deadline.
+    """
+    providers = DEFAULT_PROVIDERS if providers is None else providers
+    started = time.monotonic()
+
+    pending = []
+    for provider in providers:
+        limit = deadline or provider.deadline or Config.PROVIDER_DEADLINE
+        future = _executor.submit(_safe_fetch, provider, lat, lon, start_dt, end_dt)
+        pending.append((limit, provider.name, future))
+
+    results = {}
+    # Providers run in parallel, so each wait only covers what's left of its own deadline
+    for limit, name, future in sorted(pending, key=lambda item: item[0]):
+        wait([future], timeout=max(0.0, started + limit - time.monotonic()))
+        if future.done():
+            results[name] = future.result()
+        else:
+            print(f"[{name}] missed the {limit}s deadline")
+            results[name] = None
+    return {provider.name: results[provider.name] for provider in providers}
@@ -0,0 +1,114 @@
+#scheduler.py
+# Background job that precomputes the next-24h forecast for every registered location
+# shortly after each hour boundary: one bulk Open-Meteo request, one batched inference,
+# results written to the forecast cache so /predictions only reads them.
+
+import fcntl
+import random
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from config import Config
+from dbmodles.location import get_location_key
+from services.forecast_cache import put_forecast
+from services.load_predict2 import predict_next_24_hours_batch
+from services.locations import known_locations
+from services.weather_api import fetch_latest_bulk
+
+
+class ForecastScheduler:
+    def __init__(self, app, locations=None, jitter_seconds=None, clock=datetime.now, rng=None, lock_path=None):
+        self.app = app
+        self.locations = known_locations if locations is None else locations
+        self.jitter_seconds = Config.PRECOMPUTE_JITTER_SECONDS if jitter_seconds is None else jitter_seconds
+        self.clock = clock
+        self.rng = rng or random.Random()
+        # Lock file so only one worker process runs a given hour's job
+        self.lock_path = Config.PRECOMPUTE_LOCK_PATH if lock_path is None else lock_path
+        self._running = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def next_run_time(self, now):
+        # Next hour boundary plus jitter, so workers and providers aren't hit on the dot
+        next_hour = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        return next_hour + timedelta(seconds=self.rng.uniform(0, self.jitter_seconds))
+
+    def run_once(self, now=None):
+        """Precompute forecasts issued at now's hour. Returns how many were stored, or None
+        if a run is in progress or this hour was already done (here or in another worker)."""
+        now = now or self.clock()
+        hour = now.replace(minute=0, second=0, microsecond=0).isoformat(timespec="minutes")
+
+        if not self._running.acquire(blocking=False):
+            print("[scheduler] previous run still in progress, skipping")
+            return None
+        lock_file = open(self.lock_path, "a+") if self.lock_path else None
+        try:
+            if lock_file is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    print("[scheduler] another process is running this job, skipping")
+                    return None
+                # The lock file remembers the last completed hour
+                lock_file.seek(0)
+                if lock_file.read().strip() == hour:
+                    return None
+
+            stored = self._precompute(now)
+
+            if lock_file is not None:
+                lock_file.seek(0)
+                lock_file.truncate()
+                lock_file.write(hour)
+                lock_file.flush()
+            return stored
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+            self._running.release()
+
+    def _precompute(self, now):
+        start = time.time()
+        location_ids = list(self.locations)
+        coords = [self.locations[loc_id] for loc_id in location_ids]
+
+        with self.app.app_context():
+            windows = fetch_latest_bulk(coords, now)
+            ready = [i for i, window in enumerate(windows) if window is not None]
+            if not ready:
+                return 0
+
+            forecasts = predict_next_24_hours_batch([windows[i] for i in ready], [location_ids[i] for i in ready])
+            last_time = now.replace(minute=0, second=0, microsecond=0).isoformat(timespec="minutes")
+            for i, forecast in zip(ready, forecasts):
+                payload = {"predictions": [round(float(temp), 2) for temp in forecast], "last_time": last_time}
+                put_forecast(get_location_key(*coords[i]), now, payload)
+
+        print(f"[scheduler] {len(ready)}/{len(coords)} forecasts precomputed in {time.time() - start:.2f}s")
+        return len(ready)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            delay = (self.next_run_time(self.clock()) - self.clock()).total_seconds()
+            if self._stop.wait(max(delay, 0)):
+                break
+            try:
+                self.run_once()
+            except Exception:
+                print("[scheduler] run failed:", traceback.format_exc())
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="forecast-scheduler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
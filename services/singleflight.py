@@ -0,0 +1,216 @@
+#singleflight.py
+# Request coalescing: concurrent calls for the same key wait on one in-flight
+# computation and share its result.
+#
+# Within a process, followers wait on the leader's threading.Event. Across gunicorn
+# workers, a backend lock (fcntl file lock or SQLite lease) serialises the leaders;
+# whoever gets it second runs `check` first, which re-reads the shared cache the first
+# leader just wrote (geocode cache, weather table, forecast cache) instead of redoing
+# the work.
+
+import fcntl
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from config import Config
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ThreadBackend:
+    # In-process coalescing only; nothing to lock across workers
+    @contextmanager
+    def acquire(self, key):
+        yield
+
+
+class FileLockBackend:
+    """One flock()ed file per key under lock_dir, removed again on release.
+
+    Because the holder unlinks the file, a waiter can end up locking a file that is no
+    longer at the path; it checks the inode after locking and starts over if so.
+    """
+
+    def __init__(self, lock_dir, wait_seconds=30.0, poll=0.05):
+        self.lock_dir = lock_dir
+        self.wait_seconds = wait_seconds
+        self.poll = poll
+        os.makedirs(lock_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.lock_dir, hashlib.sha1(key.encode()).hexdigest() + ".lock")
+
+    def _try_lock(self, path):
+        # An open, locked file that is still the one at path, or None
+        f = open(path, "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            if os.fstat(f.fileno()).st_ino == os.stat(path).st_ino:
+                return f
+        except (BlockingIOError, FileNotFoundError):
+            pass
+        f.close()
+        return None
+
+    @contextmanager
+    def acquire(self, key):
+        path = self._path(key)
+        deadline = time.monotonic() + self.wait_seconds
+        f = self._try_lock(path)
+        while f is None and time.monotonic() < deadline:
+            time.sleep(self.poll)
+            f = self._try_lock(path)
+        if f is None:
+            # a stuck holder shouldn't stall requests; go ahead unlocked
+            print(f"[singleflight] gave up waiting for {key}")
+        try:
+            yield
+        finally:
+            if f is not None:
+                os.unlink(path)
+                fcntl.flock(f, fcntl.LOCK_UN)
+                f.close()
+
+
+class SQLiteLeaseBackend:
+    """Leases in a SQLite table; a lease left behind by a crashed worker expires."""
+
+    def __init__(self, path, lease_seconds=30.0, wait_seconds=30.0, poll=0.05):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.wait_seconds = wait_seconds
+        self.poll = poll
+
+    def _db(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS singleflight_lease ("
+            " key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        return conn
+
+    def _try_acquire(self, key, owner):
+        now = time.time()
+        conn = self._db()
+        try:
+            with conn:
+                conn.execute("DELETE FROM singleflight_lease WHERE key = ? AND expires_at < ?", (key, now))
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO singleflight_lease (key, owner, expires_at) VALUES (?, ?, ?)",
+                    (key, owner, now + self.lease_seconds),
+                )
+                return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def _release(self, key, owner):
+        conn = self._db()
+        try:
+            with conn:
+                conn.execute("DELETE FROM singleflight_lease WHERE key = ? AND owner = ?", (key, owner))
+        finally:
+            conn.close()
+
+    @contextmanager
+    def acquire(self, key):
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_seconds
+        locked = self._try_acquire(key, owner)
+        while not locked and time.monotonic() < deadline:
+            time.sleep(self.poll)
+            locked = self._try_acquire(key, owner)
+        if not locked:
+            print(f"[singleflight] gave up waiting for {key}")
+        try:
+            yield
+        finally:
+            if locked:
+                self._release(key, owner)
+
+
+class SingleFlight:
+    def __init__(self, backend=None, wait_seconds=30.0):
+        self.backend = backend or ThreadBackend()
+        self.wait_seconds = wait_seconds
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.stats = {"leaders": 0, "followers": 0}
+
+    def _join(self, key):
+        # (call, is_leader)
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.stats["followers"] += 1
+                return call, False
+            call = self._calls[key] = _Call()
+            self.stats["leaders"] += 1
+            return call, True
+
+    def _finish(self, key, call):
+        with self._lock:
+            del self._calls[key]
+        call.done.set()
+
+    def _follow(self, call):
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def do(self, key, fn, check=None):
+        """Return fn(), shared with every concurrent do() for the same key.
+
+        check, if given, is called once the cross-worker lock is held; a result other
+        than None is returned as is and fn is skipped.
+        """
+        call, leader = self._join(key)
+        if not leader:
+            if call.done.wait(self.wait_seconds):
+                return self._follow(call)
+            return fn()
+
+        try:
+            with self.backend.acquire(key):
+                result = check() if check is not None else None
+                call.result = result if result is not None else fn()
+        except Exception as e:
+            call.error = e
+        finally:
+            self._finish(key, call)
+        return self._follow(call)
+
+
+def _make_backend():
+    if Config.SINGLEFLIGHT_BACKEND == "file":
+        return FileLockBackend(Config.SINGLEFLIGHT_LOCK_DIR, Config.SINGLEFLIGHT_WAIT_SECONDS)
+    if Config.SINGLEFLIGHT_BACKEND == "sqlite":
+        return SQLiteLeaseBackend(Config.SINGLEFLIGHT_LEASE_PATH, Config.SINGLEFLIGHT_LEASE_SECONDS,
+                                  Config.SINGLEFLIGHT_WAIT_SECONDS)
+    return ThreadBackend()
+
+
+_group = None
+_group_lock = threading.Lock()
+
+
+def get_group():
+    global _group
+    if _group is None:
+        with _group_lock:
+            if _group is None:
+                _group = SingleFlight(_make_backend(), Config.SINGLEFLIGHT_WAIT_SECONDS)
+    return _group
+
+
+def coalesce(key, fn, check=None):
+    return get_group().do(key, fn, check)
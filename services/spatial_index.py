@@ -0,0 +1,26 @@
+#spatial_index.py
+# Nearest registered location by great-circle distance: a haversine BallTree built once
+# over the registered coordinates, answering k-nearest queries in O(log n).
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+class LocationIndex:
+    def __init__(self, locations):
+        # locations: {location_id: (lat, lon)}
+        self.ids = np.array(list(locations))
+        coords = np.array([locations[loc_id] for loc_id in self.ids], dtype=np.float64)
+        self.tree = BallTree(np.radians(coords), metric="haversine")
+
+    def nearest_batch(self, coords, k=1):
+        """(ids, distances_km), each (N, k), for an (N, 2) array of (lat, lon)."""
+        points = np.radians(np.asarray(coords, dtype=np.float64).reshape(-1, 2))
+        distances, indices = self.tree.query(points, k=min(k, len(self.ids)))
+        return self.ids[indices], distances * EARTH_RADIUS_KM
+
+    def nearest(self, lat, lon, k=1):
+        ids, distances = self.nearest_batch([(lat, lon)], k)
+        return ids[0].tolist(), distances[0].tolist()
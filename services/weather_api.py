@@ -1,47 +1,43 @@
 # weather_api.py
 
-import requests
-from datetime import date as dt_date, timedelta
-
-from dbmodles.weather import Weather, db
 from datetime import date as dt_date, datetime, timedelta
-import requests
 
-def fetch_temperature_data(lat, lon, user_date, end_time=None):
-    today = dt_date.today()
+import numpy as np
 
-    # Step 1: Try to load from DB first
-    if end_time:
-        # We need 24 hours ending at `end_time`
-        start_dt = end_time - timedelta(hours=23)
-        db_records = db.session.query(Weather).filter(
-            Weather.latitude == lat,
-            Weather.longitude == lon,
-            Weather.date.between(start_dt.date(), end_time.date())
-        ).order_by(Weather.date, Weather.hour).all()
-
-        # Filter and collect matching records into a list
-        db_times = []
-        db_temps = []
-
-        for rec in db_records:
-            record_time = datetime.combine(rec.date, datetime.min.time()) + timedelta(hours=rec.hour)
-            if start_dt <= record_time <= end_time:
-                db_times.append(record_time.isoformat(timespec="minutes"))
-                db_temps.append(rec.temperature_2m)
-
-        if len(db_temps) == 24:
-            return start_dt.date(), end_time.date(), db_temps, db_times 
-
-    # Step 2: Fallback to Open-Meteo API
+from config import Config
+from dbmodles.location import cell_center, get_location_key
+from dbmodles.weather import fetch_hourly_range, hourly_rows, upsert_hourly
+from services.http_client import get_json
+from services.singleflight import coalesce
+
+def _db_window(location_key, end_time):
+    # We need 24 hours ending at `end_time`
+    start_dt = end_time - timedelta(hours=23)
+    db_temps = fetch_hourly_range(location_key, start_dt, end_time)
+
+    if len(db_temps) == 24 and not np.isnan(db_temps).any():
+        window_start = start_dt.replace(minute=0, second=0, microsecond=0)
+        db_times = [(window_start + timedelta(hours=i)).isoformat(timespec="minutes") for i in range(24)]
+        return start_dt.date(), end_time.date(), db_temps.tolist(), db_times
+    return None
+
+
+def _api_request(lat, lon, user_date):
+    today = dt_date.today()
     if user_date < today:
-        url = "https://archive-api.open-meteo.com/v1/archive"
+        url = Config.OPEN_METEO_ARCHIVE_URL
     else:
-        url = "https://api.open-meteo.com/v1/forecast"
+        url = Config.OPEN_METEO_FORECAST_URL
 
     start_date = user_date - timedelta(days=1)
     end_date = user_date
 
+    # Settled archive ranges never change; anything recent or forecast goes stale quickly
+    if end_date < today - timedelta(days=Config.HISTORICAL_SETTLE_DAYS):
+        ttl = Config.HISTORICAL_CACHE_TTL
+    else:
+        ttl = Config.FORECAST_CACHE_TTL
+
     params = {
         "latitude": lat,
         "longitude": lon,
@@ -50,19 +46,25 @@ def fetch_temperature_data(lat, lon, user_date, end_time=None):
         "end_date": end_date.strftime("%Y-%m-%d"),
         "timezone": "auto"
     }
+    return url, params, ttl, start_date, end_date
 
-    response = requests.get(url, params=params, verify=False)
-    if response.status_code != 200:
-        print("API call failed:", response.status_code, response.text)
-        return start_date, end_date, None, None
 
+def _parse_hourly(data):
     try:
-        data = response.json()
-        times = data['hourly']['time']
-        temps = data['hourly']['temperature_2m']
+        return data['hourly']['time'], data['hourly']['temperature_2m']
     except KeyError:
-        return start_date, end_date, None, None
+        return None, None
+
+
+def _observed_rows(location_key, lat, lon, times, temps):
+    # Only hours up to now are observations. Later hours in a forecast response are model
+    # output; stored, they would be served back as history and shown as "Actual".
+    now_iso = datetime.now().strftime("%Y-%m-%dT%H:00")
+    keep = [i for i, time_str in enumerate(times) if time_str <= now_iso]
+    return hourly_rows(location_key, lat, lon, [times[i] for i in keep], [temps[i] for i in keep])
 
+
+def _window(times, temps, start_date, end_date, end_time):
     if end_time:
         end_iso = end_time.strftime("%Y-%m-%dT%H:00")
         if end_iso not in times:
@@ -75,3 +77,78 @@ def fetch_temperature_data(lat, lon, user_date, end_time=None):
     else:
         past_24 = temps[-24:] if len(temps) >= 24 else None
         return start_date, end_date, past_24, times
+
+
+def fetch_temperature_data(lat, lon, user_date, end_time=None):
+    # Everything is keyed by the grid cell, so nearby coordinates share cached rows
+    location_key = get_location_key(lat, lon)
+    lat, lon = cell_center(lat, lon)
+
+    # Step 1: Try to load from DB first
+    if end_time:
+        cached = _db_window(location_key, end_time)
+        if cached is not None:
+            return cached
+
+    # Step 2: Fallback to Open-Meteo API, one call per cell and window however many ask at once
+    return coalesce(_flight_key(location_key, user_date, end_time),
+                    lambda: _fetch_and_store(location_key, lat, lon, user_date, end_time),
+                    check=(lambda: _db_window(location_key, end_time)) if end_time else None)
+
+
+def _flight_key(location_key, user_date, end_time):
+    return f"history:{location_key}:{user_date.isoformat()}:{end_time.strftime('%Y-%m-%dT%H') if end_time else ''}"
+
+
+def _fetch_and_store(location_key, lat, lon, user_date, end_time):
+    url, params, ttl, start_date, end_date = _api_request(lat, lon, user_date)
+    status, data = get_json(url, params=params, ttl=ttl)
+    if status != 200 or data is None:
+        return start_date, end_date, None, None
+
+    times, temps = _parse_hourly(data)
+    if times is None:
+        return start_date, end_date, None, None
+
+    # Keep the observed hours so the next request for this window is served from the DB
+    upsert_hourly(_observed_rows(location_key, lat, lon, times, temps))
+    return _window(times, temps, start_date, end_date, end_time)
+
+
+def fetch_latest_bulk(coords, end_time):
+    """24 hourly temps ending at end_time for many (lat, lon) pairs in one Open-Meteo call.
+
+    Returns one list (or None when the hour is missing) per coordinate, in order.
+    """
+    location_keys = [get_location_key(lat, lon) for lat, lon in coords]
+    centers = [cell_center(lat, lon) for lat, lon in coords]
+
+    params = {
+        "latitude": ",".join(str(lat) for lat, _ in centers),
+        "longitude": ",".join(str(lon) for _, lon in centers),
+        "hourly": "temperature_2m",
+        "start_date": (end_time.date() - timedelta(days=1)).strftime("%Y-%m-%d"),
+        "end_date": end_time.date().strftime("%Y-%m-%d"),
+        "timezone": "auto"
+    }
+    status, data = get_json(Config.OPEN_METEO_FORECAST_URL, params=params)
+    if status != 200 or data is None:
+        return [None] * len(coords)
+    # A single location comes back as an object, several as a list
+    results = data if isinstance(data, list) else [data]
+
+    end_iso = end_time.strftime("%Y-%m-%dT%H:00")
+    windows = []
+    for location_key, (lat, lon), result in zip(location_keys, centers, results):
+        try:
+            times = result['hourly']['time']
+            temps = result['hourly']['temperature_2m']
+        except KeyError:
+            windows.append(None)
+            continue
+        upsert_hourly(_observed_rows(location_key, lat, lon, times, temps))
+
+        idx = times.index(end_iso) if end_iso in times else -1
+        window = temps[idx - 23: idx + 1] if idx >= 23 else None
+        windows.append(window if window and None not in window else None)
+    return windows